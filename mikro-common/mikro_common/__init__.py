@@ -12,29 +12,56 @@ Licence: MIT
 
 __version__ = "0.1.0"
 
-from .client import MikroTikClient
-from .config import load_routers, get_router_config
-from .resource import ResourceManager
-from .cli import ResourceCLI
-from .access import (
-    check_permission,
-    require_permission,
-    load_users,
-    load_groups,
-    get_user_permissions,
-    AccessDeniedError
-)
+import importlib
+
+# Public names and the submodules providing them. Submodules are imported
+# on first attribute access (PEP 562) so that CLI startup only pays for
+# what it uses.
+_LAZY_ATTRS = {
+    "MikroTikClient": ".client",
+    "load_routers": ".config",
+    "get_router_config": ".config",
+    "clear_caches": "._yaml_cache",
+    "ResourceManager": ".resource",
+    "ResourceCLI": ".cli",
+    "write_lines": ".cli",
+    "check_permission": ".access",
+    "require_permission": ".access",
+    "load_users": ".access",
+    "load_groups": ".access",
+    "get_user_permissions": ".access",
+    "build_permission_index": ".access",
+    "AccessDeniedError": ".access",
+}
 
 __all__ = [
     "MikroTikClient",
     "load_routers",
     "get_router_config",
+    "clear_caches",
     "ResourceManager",
     "ResourceCLI",
+    "write_lines",
     "check_permission",
     "require_permission",
     "load_users",
     "load_groups",
     "get_user_permissions",
+    "build_permission_index",
     "AccessDeniedError"
 ]
+
+
+def __getattr__(name):
+    """Import public names from their submodule on first access"""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Include lazily imported names in dir()"""
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+_yaml_cache.py
+
+  MikroTik management tools
+
+Copyright (c) 2025 Tim Hosking
+Email: tim@mungerware.com
+Website: https://github.com/munger
+Licence: MIT
+"""
+
+import os
+import re
+import logging
+import functools
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# PyYAML module and loader class, imported on first use by _get_yaml()
+_yaml = None
+_YamlLoader = None
+
+# Maximum number of parsed files kept in memory
+_YAML_CACHE_SIZE = 100
+
+# Absolute path -> (mtime_ns, size, parsed data), least recently used first
+_YAML_CACHE: "OrderedDict[str, Tuple[int, int, Any]]" = OrderedDict()
+
+# Below this many uncached files, parsing them one by one is cheaper than
+# building a combined multi-document stream
+_BATCH_MIN_FILES = 3
+
+# Document start/end markers and directives at the start of a line
+_DOC_MARKER = re.compile(rb'^(?:---|\.\.\.)(?=[ \t\r\n]|$)', re.MULTILINE)
+_DIRECTIVE = re.compile(rb'^%', re.MULTILINE)
+
+# Memoized directory loaders registered via _dir_cached()
+_DIR_CACHES: List[Callable] = []
+
+
+def _get_yaml():
+    """
+    Import PyYAML on first use.
+
+    Prefers the libyaml-backed loader, falling back to pure Python if
+    PyYAML was built without it.
+
+    Returns:
+        The yaml module
+    """
+    global _yaml, _YamlLoader
+    if _yaml is None:
+        import yaml
+        _YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        if _YamlLoader is yaml.SafeLoader:
+            logger.debug("libyaml not available, using pure-Python YAML loader")
+        _yaml = yaml
+    return _yaml
+
+
+def _iter_yaml_entries(directory) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """
+    Scan a directory once for YAML files.
+
+    Args:
+        directory: Directory to scan
+
+    Yields:
+        (name, full path, stat result) for each *.yaml file, sorted by name
+    """
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.endswith(".yaml") and entry.is_file():
+                entries.append((entry.name, entry.path, entry.stat()))
+    entries.sort()
+    return iter(entries)
+
+
+def _load_yaml_cached(path, st: Optional[os.stat_result] = None) -> Any:
+    """
+    Load a YAML file, reusing the parsed result while the file is unchanged.
+
+    Files are keyed by absolute path and considered unchanged while their
+    mtime and size match the cached values. The parsed object is shared
+    between callers and must be treated as read-only.
+
+    Args:
+        path: Path to the YAML file
+        st: Stat result for the file, if the caller already has one
+
+    Returns:
+        Parsed YAML document
+    """
+    path = os.path.abspath(path)
+    if st is None:
+        st = os.stat(path)
+
+    cached = _YAML_CACHE.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        _YAML_CACHE.move_to_end(path)
+        return cached[2]
+
+    # Read as bytes so libyaml decodes UTF-8 itself, without an
+    # intermediate str
+    yaml = _get_yaml()
+    with open(path, 'rb') as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+
+    _store_yaml(path, st, data)
+    return data
+
+
+def _store_yaml(path: str, st: os.stat_result, data: Any):
+    """Insert a parsed file into the cache, evicting the oldest if full"""
+    _YAML_CACHE[path] = (st.st_mtime_ns, st.st_size, data)
+    _YAML_CACHE.move_to_end(path)
+    if len(_YAML_CACHE) > _YAML_CACHE_SIZE:
+        _YAML_CACHE.popitem(last=False)
+
+
+def _batch_content(content: bytes) -> Optional[bytes]:
+    """
+    Prepare a file's content for a batched multi-document stream.
+
+    A leading '---' line (after any blank or comment lines) is removed.
+    Files with any other document marker, a directive or a byte order mark
+    can't be split back out of a stream reliably and are left out.
+
+    Args:
+        content: Raw file content
+
+    Returns:
+        Content holding exactly one document's worth of YAML, or None
+    """
+    if content.startswith(b'\xef\xbb\xbf') or _DIRECTIVE.search(content):
+        return None
+
+    markers = list(_DOC_MARKER.finditer(content))
+    if not markers:
+        return content
+    marker = markers[0]
+    if len(markers) > 1 or marker.group() != b'---':
+        return None
+
+    head = content[:marker.start()]
+    if any(line.strip() and not line.lstrip().startswith(b'#') for line in head.splitlines()):
+        return None
+    end = content.find(b'\n', marker.end())
+    if end < 0:
+        end = len(content)
+    rest = content[marker.end():end].strip()
+    if rest and not rest.startswith(b'#'):
+        return None
+    return content[end + 1:]
+
+
+def _preload_yaml(entries: List[Tuple[str, str, os.stat_result]]):
+    """
+    Parse uncached files from a directory scan in a single YAML stream.
+
+    Each file is given its own explicit '---' marker and the files are
+    parsed with a single load_all() call, so the n-th document belongs to
+    the n-th file. Files whose own markers would break that (see
+    _batch_content()) are left to _load_yaml_cached(), as is everything if
+    the stream fails to parse, so errors are still reported per file.
+
+    Args:
+        entries: (name, full path, stat result) tuples from _iter_yaml_entries()
+    """
+    missing = []
+    for _, path, st in entries:
+        path = os.path.abspath(path)
+        cached = _YAML_CACHE.get(path)
+        if cached is None or cached[0] != st.st_mtime_ns or cached[1] != st.st_size:
+            missing.append((path, st))
+
+    if len(missing) < _BATCH_MIN_FILES or len(missing) > _YAML_CACHE_SIZE:
+        return
+
+    batch = []
+    chunks = []
+    for path, st in missing:
+        try:
+            content = _batch_content(Path(path).read_bytes())
+        except OSError:
+            continue
+        if content is not None:
+            batch.append((path, st))
+            chunks.append(b"---\n" + content + b"\n")
+
+    if len(batch) < _BATCH_MIN_FILES:
+        return
+
+    yaml = _get_yaml()
+    try:
+        documents = list(yaml.load_all(b"".join(chunks), Loader=_YamlLoader))
+    except Exception:
+        return
+
+    if len(documents) != len(batch):
+        return
+
+    for (path, st), data in zip(batch, documents):
+        _store_yaml(path, st, data)
+
+
+def _safe_parse(path, st: os.stat_result, section: str,
+                key_field: str) -> Optional[Tuple[str, Dict]]:
+    """
+    Load one config file and extract its named record.
+
+    For example, section 'user' and key_field 'username' turn
+    ``user: {username: alice, ...}`` into ('alice', {...}).
+
+    Args:
+        path: Path to the YAML file
+        st: Stat result for the file
+        section: Top-level key holding the record
+        key_field: Record field holding its name
+
+    Returns:
+        Tuple of (name, record), or None if the file fails to load (logged
+        as a warning) or has no such section or name
+    """
+    try:
+        data = _load_yaml_cached(path, st)
+        if not data or section not in data:
+            return None
+        record = data[section]
+        key = record.get(key_field)
+    except Exception as e:
+        logger.warning("Failed to load %s: %s", path, e)
+        return None
+    return (key, record) if key else None
+
+
+def _dir_signature(entries: List[Tuple[str, str, os.stat_result]]) -> Tuple:
+    """
+    Build a cheap signature of a directory from its scan.
+
+    Args:
+        entries: (name, full path, stat result) tuples from _iter_yaml_entries()
+
+    Returns:
+        Sorted tuple of (name, mtime_ns, size, uid) for each *.yaml file
+    """
+    return tuple(
+        (name, st.st_mtime_ns, st.st_size, st.st_uid)
+        for name, _, st in entries
+    )
+
+
+def _dir_cached(func: Callable) -> Callable:
+    """
+    Memoize a directory loader taking (directory, signature, ...) arguments.
+
+    Only positional arguments form the key. Keyword arguments, such as the
+    directory scan the signature was built from, are passed through to the
+    loader on a miss. Only the most recent result is kept, so a loader is
+    re-run whenever the directory signature changes.
+    """
+    last: List = []
+
+    @functools.wraps(func)
+    def cached(*args, **kwargs):
+        if last and last[0] == args:
+            return last[1]
+        result = func(*args, **kwargs)
+        last[:] = (args, result)
+        return result
+
+    cached.cache_clear = last.clear
+    _DIR_CACHES.append(cached)
+    return cached
+
+
+def clear_caches():
+    """Discard all in-memory YAML caches and memoized config directories"""
+    _YAML_CACHE.clear()
+    for cached in _DIR_CACHES:
+        cached.cache_clear()
@@ -12,19 +12,36 @@ Licence: MIT
 
 import os
 import pwd
-import yaml
-from pathlib import Path
-from typing import Dict, List, Set, Optional
+import functools
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Set, Optional, Tuple, Union
+from ._yaml_cache import (
+    _iter_yaml_entries, _preload_yaml, _safe_parse, _dir_signature, _dir_cached
+)
 
 
 CONFIG_DIR = "/etc/mikro-manager"
 
+# Actions granted by each group access level
+_ACCESS_MAP = {
+    'read-write': ('read', 'write'),
+    'read-only': ('read',),
+    'write-only': ('write',),
+}
+
 
 class AccessDeniedError(PermissionError):
     """Raised when user doesn't have required permissions"""
     pass
 
 
+class _PermissionTables(NamedTuple):
+    """Lookup tables derived from a permission index for check_permission"""
+    # username -> module -> actions; '*' as a module or action is a wildcard
+    permissions: Dict[str, Dict[str, FrozenSet[str]]]
+    # True if no users are configured (everyone has access)
+    allow_all: bool
+
+
 def get_current_user() -> str:
     """Get the current Unix username"""
     return pwd.getpwuid(os.getuid()).pw_name
@@ -33,6 +50,9 @@ def get_current_user() -> str:
 def load_users() -> Dict[str, Dict]:
     """
     Load user configurations from /etc/mikro-manager/users.d directory.
+    
+    Results are reused for the rest of the process until a file in the
+    directory changes; edits made between CLI invocations are always seen.
         
     Returns:
         Dictionary mapping usernames to their configurations
@@ -43,30 +63,25 @@ def load_users() -> Dict[str, Dict]:
         # No users.d directory - allow all access (backward compatibility)
         return {}
     
-    users = {}
-    yaml_files = sorted(Path(users_dir).glob("*.yaml"))
-    
-    for yaml_file in yaml_files:
-        if yaml_file.name == 'README.md':
-            continue
-            
-        try:
-            with open(yaml_file, 'r') as f:
-                data = yaml.safe_load(f)
-                if data and 'user' in data:
-                    user = data['user']
-                    username = user.get('username')
-                    if username:
-                        users[username] = user
-        except Exception as e:
-            print(f"Warning: Failed to load {yaml_file}: {e}")
+    entries = list(_iter_yaml_entries(users_dir))
+    return _load_users_dir(users_dir, _dir_signature(entries), entries=entries)
+
+
+@_dir_cached
+def _load_users_dir(users_dir: str, signature: tuple, entries: List) -> Dict[str, Dict]:
+    """Load users.d from its scan, memoized on the directory signature"""
+    _preload_yaml(entries)
     
-    return users
+    parsed = (_safe_parse(yaml_file, st, 'user', 'username') for _, yaml_file, st in entries)
+    return {username: user for username, user in filter(None, parsed)}
 
 
 def load_groups() -> Dict[str, Dict]:
     """
     Load group configurations from /etc/mikro-manager/groups.d directory.
+    
+    Results are reused for the rest of the process until a file in the
+    directory changes; edits made between CLI invocations are always seen.
         
     Returns:
         Dictionary mapping group names to their configurations
@@ -76,72 +91,74 @@ def load_groups() -> Dict[str, Dict]:
     if not os.path.isdir(groups_dir):
         return {}
     
-    groups = {}
-    yaml_files = sorted(Path(groups_dir).glob("*.yaml"))
-    
-    for yaml_file in yaml_files:
-        if yaml_file.name == 'README.md':
-            continue
-            
-        try:
-            with open(yaml_file, 'r') as f:
-                data = yaml.safe_load(f)
-                if data and 'group' in data:
-                    group = data['group']
-                    name = group.get('name')
-                    if name:
-                        groups[name] = group
-        except Exception as e:
-            print(f"Warning: Failed to load {yaml_file}: {e}")
+    entries = list(_iter_yaml_entries(groups_dir))
+    return _load_groups_dir(groups_dir, _dir_signature(entries), entries=entries)
+
+
+@_dir_cached
+def _load_groups_dir(groups_dir: str, signature: tuple, entries: List) -> Dict[str, Dict]:
+    """Load groups.d from its scan, memoized on the directory signature"""
+    _preload_yaml(entries)
     
-    return groups
+    parsed = (_safe_parse(yaml_file, st, 'group', 'name') for _, yaml_file, st in entries)
+    return {name: group for name, group in filter(None, parsed)}
 
 
-def get_user_permissions(username: str, users: Dict, groups: Dict) -> Set[str]:
+def _group_resolver(groups: Union[Dict, Callable[[], Dict]]) -> Callable[[], Dict]:
+    """Wrap a groups dict or loader so the loader runs at most once, on demand"""
+    if callable(groups):
+        return functools.lru_cache(maxsize=None)(groups)
+    return lambda: groups
+
+
+def _parse_group_item(group_item) -> Tuple[Optional[str], Optional[str]]:
     """
-    Get all permissions for a user based on their group memberships.
+    Parse one entry of a user's group list.
+    
+    Handles multiple formats for groups:
+    Simple: monitor
+    With access override: "dns-admin:read-only"
+    Dict format: {name: dns-admin, access: read-only}
     
     Args:
-        username: Username to check
-        users: Dictionary of user configurations
-        groups: Dictionary of group configurations
+        group_item: Group list entry
         
     Returns:
-        Set of permission strings (e.g., 'dns:read', 'dns:write', 'firewall:*')
+        Tuple of (group name, access override or None)
     """
-    # If no users configured, allow all
-    if not users:
-        return {'*'}
-    
-    # Check if user exists
-    if username not in users:
-        return set()
+    item_type = type(group_item)
+    if item_type is dict:
+        return group_item.get('name'), group_item.get('access')
+    if item_type is str:
+        # Format: "group-name:access-level"
+        group_name, _, access_override = group_item.partition(':')
+        return group_name, access_override or None
+    return group_item, None
+
+
+def _expand_user_permissions(user: Dict, get_groups: Callable[[], Dict]) -> Set[str]:
+    """
+    Expand a user's group memberships into permission strings.
     
-    user = users[username]
+    Args:
+        user: User configuration
+        get_groups: Callable returning the group configurations
+        
+    Returns:
+        Set of permission strings
+    """
     permissions_list = user.get('permissions', [])
     
     permissions = set()
     for perm_entry in permissions_list:
         user_groups = perm_entry.get('groups', [])
         
-        # Handle multiple formats for groups:
-        # Simple: [monitor, dns-admin]
-        # With access override: [monitor, "dns-admin:read-only"]
-        # Dict format: [{name: dns-admin, access: read-only}]
         for group_item in user_groups:
-            # Parse group name and access override
-            if isinstance(group_item, dict):
-                group_name = group_item.get('name')
-                access_override = group_item.get('access')
-            elif isinstance(group_item, str) and ':' in group_item:
-                # Format: "group-name:access-level"
-                group_name, access_override = group_item.split(':', 1)
-            else:
-                group_name = group_item
-                access_override = None
+            group_name, access_override = _parse_group_item(group_item)
             
-            if group_name in groups:
-                group = groups[group_name]
+            group_map = get_groups()
+            if group_name in group_map:
+                group = group_map[group_name]
                 modules = group.get('modules', [])
                 # Use override if specified, otherwise use group's access level
                 # Support both 'access' and 'default_access' for backward compatibility
@@ -157,18 +174,140 @@ def get_user_permissions(username: str, users: Dict, groups: Dict) -> Set[str]:
                     modules = [modules]
                 
                 # Convert access level to permissions
+                actions = _ACCESS_MAP.get(access_level, ())
                 for module in modules:
-                    if access_level == 'read-write':
-                        permissions.add(f"{module}:read")
-                        permissions.add(f"{module}:write")
-                    elif access_level == 'read-only':
-                        permissions.add(f"{module}:read")
-                    elif access_level == 'write-only':
-                        permissions.add(f"{module}:write")
+                    for action in actions:
+                        permissions.add(f"{module}:{action}")
     
     return permissions
 
 
+def build_permission_index(users: Dict,
+                           groups: Union[Dict, Callable[[], Dict]]) -> Dict[str, FrozenSet[str]]:
+    """
+    Expand permissions for every configured user in one pass.
+    
+    Args:
+        users: Dictionary of user configurations
+        groups: Dictionary of group configurations, or a callable returning
+            one (only invoked once a group name needs resolving)
+        
+    Returns:
+        Dictionary mapping usernames to frozensets of permission strings.
+        If no users are configured, a single '*' entry grants everything.
+    """
+    # If no users configured, allow all
+    if not users:
+        return {'*': frozenset({'*'})}
+    
+    get_groups = _group_resolver(groups)
+    return {
+        username: frozenset(_expand_user_permissions(user, get_groups))
+        for username, user in users.items()
+    }
+
+
+def _build_permission_tables(index: Dict[str, FrozenSet[str]], allow_all: bool) -> _PermissionTables:
+    """
+    Regroup a permission index by module for check_permission.
+    
+    'dns:read' becomes {'dns': {'read'}}, 'dns:*' becomes {'dns': {'*'}} and
+    '*' becomes {'*': {'*'}}.
+    
+    Args:
+        index: Permission index from build_permission_index()
+        allow_all: Whether no users are configured
+        
+    Returns:
+        Permission lookup tables
+    """
+    permissions = {}
+    for username, perms in index.items():
+        modules = {}
+        for perm in perms:
+            module, _, action = perm.partition(':')
+            modules.setdefault(module, set()).add(action or '*')
+        permissions[username] = {module: frozenset(actions) for module, actions in modules.items()}
+    return _PermissionTables(permissions, allow_all)
+
+
+@_dir_cached
+def _cached_permission_tables(users_dir: str, users_signature: tuple,
+                              groups_dir: str, groups_signature: Optional[tuple],
+                              users: Dict, groups_entries: Optional[List]) -> _PermissionTables:
+    """Build the permission tables, memoized on the config directory signatures"""
+    def get_groups() -> Dict[str, Dict]:
+        if groups_signature is None:
+            return {}
+        return _load_groups_dir(groups_dir, groups_signature, entries=groups_entries)
+    
+    return _build_permission_tables(build_permission_index(users, get_groups), False)
+
+
+def _load_permission_tables(username: Optional[str] = None) -> _PermissionTables:
+    """
+    Get the permission tables for the current configuration.
+    
+    groups.d is only scanned once users are configured and, if a username
+    is given, that user is one of them.
+    
+    Args:
+        username: User about to be checked (optional)
+        
+    Returns:
+        Permission lookup tables
+    """
+    users_dir = os.path.join(CONFIG_DIR, 'users.d')
+    
+    if not os.path.isdir(users_dir):
+        # No users.d directory - allow all access (backward compatibility)
+        return _PermissionTables({}, True)
+    
+    users_entries = list(_iter_yaml_entries(users_dir))
+    users_signature = _dir_signature(users_entries)
+    users = _load_users_dir(users_dir, users_signature, entries=users_entries)
+    
+    if not users:
+        return _PermissionTables({}, True)
+    if username is not None and username not in users:
+        return _PermissionTables({}, False)
+    
+    groups_dir = os.path.join(CONFIG_DIR, 'groups.d')
+    groups_entries = groups_signature = None
+    if os.path.isdir(groups_dir):
+        groups_entries = list(_iter_yaml_entries(groups_dir))
+        groups_signature = _dir_signature(groups_entries)
+    
+    return _cached_permission_tables(users_dir, users_signature,
+                                     groups_dir, groups_signature,
+                                     users=users, groups_entries=groups_entries)
+
+
+def get_user_permissions(username: str, users: Dict,
+                         groups: Union[Dict, Callable[[], Dict]]) -> Set[str]:
+    """
+    Get all permissions for a user based on their group memberships.
+    
+    Args:
+        username: Username to check
+        users: Dictionary of user configurations
+        groups: Dictionary of group configurations, or a callable returning
+            one (only invoked once a group name needs resolving)
+        
+    Returns:
+        Set of permission strings (e.g., 'dns:read', 'dns:write', 'firewall:*')
+    """
+    # If no users configured, allow all
+    if not users:
+        return {'*'}
+    
+    # Check if user exists
+    if username not in users:
+        return set()
+    
+    return _expand_user_permissions(users[username], _group_resolver(groups))
+
+
 def check_permission(required_permission: str) -> bool:
     """
     Check if current user has the required permission.
@@ -184,29 +323,25 @@ def check_permission(required_permission: str) -> bool:
         return True
     
     username = get_current_user()
-    users = load_users()
-    groups = load_groups()
+    tables = _load_permission_tables(username)
     
     # If no users configured, allow all (backward compatibility)
-    if not users:
+    if tables.allow_all:
         return True
     
-    permissions = get_user_permissions(username, users, groups)
+    modules = tables.permissions.get(username)
+    if not modules:
+        return False
     
-    # Check for wildcard permission
-    if '*' in permissions:
-        return True
-    
-    # Check for exact match
-    if required_permission in permissions:
+    # Check for exact match or wildcard module permission
+    # (e.g., 'dns:*' matches 'dns:read')
+    module, _, action = required_permission.partition(':')
+    actions = modules.get(module)
+    if actions is not None and (action in actions or '*' in actions):
         return True
     
-    # Check for wildcard module permission (e.g., 'dns:*' matches 'dns:read')
-    module = required_permission.split(':')[0]
-    if f"{module}:*" in permissions:
-        return True
-    
-    return False
+    # Check for wildcard permission
+    return '*' in modules.get('*', ())
 
 
 def require_permission(required_permission: str):
@@ -12,13 +12,28 @@ Licence: MIT
 
 import sys
 import argparse
-from typing import Optional, Type
+from typing import List, Optional, Type
 from .client import MikroTikClient
 from .resource import ResourceManager
 from .config import load_routers, get_router_config
 from .access import require_permission, AccessDeniedError
 
 
+# Number of output lines written to stdout at a time
+_WRITE_CHUNK_LINES = 1000
+
+
+def write_lines(lines: List[str]):
+    """
+    Write lines to stdout in large chunks rather than one print() each.
+    
+    Args:
+        lines: Lines to write, without trailing newlines
+    """
+    for start in range(0, len(lines), _WRITE_CHUNK_LINES):
+        sys.stdout.write('\n'.join(lines[start:start + _WRITE_CHUNK_LINES]) + '\n')
+
+
 class ResourceCLI:
     """Base class for resource management CLIs"""
     
@@ -27,21 +42,51 @@ class ResourceCLI:
     RESOURCE_NAME_PLURAL = "resources"  # e.g., "dns entries", "dhcp servers"
     MANAGER_CLASS: Optional[Type[ResourceManager]] = None
     
+    def __init_subclass__(cls, **kwargs):
+        """Format help text once per subclass"""
+        super().__init_subclass__(**kwargs)
+        cls._build_help_text()
+    
+    @classmethod
+    def _build_help_text(cls):
+        """Precompute strings derived from RESOURCE_NAME and RESOURCE_NAME_PLURAL"""
+        cls.RESOURCE_NAME_TITLE = cls.RESOURCE_NAME.title()
+        cls._HELP_DESCRIPTION = f"Manage {cls.RESOURCE_NAME_PLURAL} on MikroTik routers"
+        cls._HELP_LIST = f'List all {cls.RESOURCE_NAME_PLURAL}'
+        cls._HELP_SEARCH = f'Search {cls.RESOURCE_NAME_PLURAL}'
+        cls._HELP_ENABLE = f'Enable a {cls.RESOURCE_NAME}'
+        cls._HELP_DISABLE = f'Disable a {cls.RESOURCE_NAME}'
+        cls._HELP_IDENTIFIER = f'{cls.RESOURCE_NAME_TITLE} identifier'
+        cls._HELP_EXPORT = f'Export {cls.RESOURCE_NAME_PLURAL}'
+        cls._HELP_IMPORT = f'Import {cls.RESOURCE_NAME_PLURAL}'
+    
     def __init__(self):
         """Initialize CLI"""
         self.parser = None
         self.args = None
     
-    def create_parser(self) -> argparse.ArgumentParser:
+    # Common subcommands, in the order they appear in help output
+    COMMON_COMMANDS = ('list', 'search', 'enable', 'disable', 'export', 'import')
+    
+    # Global options that consume the following argument
+    _GLOBAL_VALUE_OPTIONS = ('--router', '-r', '--config', '-c')
+    
+    def create_parser(self, argv: Optional[List[str]] = None) -> argparse.ArgumentParser:
         """
         Create argument parser with common options.
         Subclasses can override to add resource-specific arguments.
         
+        When argv names one of the common subcommands (and help was not
+        requested), only that subcommand's parser is built.
+        
+        Args:
+            argv: Command line arguments (default: sys.argv[1:])
+        
         Returns:
             ArgumentParser instance
         """
         parser = argparse.ArgumentParser(
-            description=f"Manage {self.RESOURCE_NAME_PLURAL} on MikroTik routers"
+            description=self._HELP_DESCRIPTION
         )
         
         # Global options
@@ -51,34 +96,66 @@ class ResourceCLI:
         # Subcommands
         subparsers = parser.add_subparsers(dest='command', help='Command to execute')
         
-        # List command
-        parser_list = subparsers.add_parser('list', help=f'List all {self.RESOURCE_NAME_PLURAL}')
-        self.add_list_arguments(parser_list)
-        
-        # Search command
-        parser_search = subparsers.add_parser('search', help=f'Search {self.RESOURCE_NAME_PLURAL}')
-        parser_search.add_argument('pattern', help='Search pattern (supports wildcards: *, ?)')
-        
-        # Enable command
-        parser_enable = subparsers.add_parser('enable', help=f'Enable a {self.RESOURCE_NAME}')
-        parser_enable.add_argument('identifier', help=f'{self.RESOURCE_NAME.title()} identifier')
+        command = self._requested_command(sys.argv[1:] if argv is None else argv)
+        for name in self.COMMON_COMMANDS:
+            if command in self.COMMON_COMMANDS and name != command:
+                continue
+            getattr(self, f'_add_{name}_parser')(subparsers)
         
-        # Disable command
-        parser_disable = subparsers.add_parser('disable', help=f'Disable a {self.RESOURCE_NAME}')
-        parser_disable.add_argument('identifier', help=f'{self.RESOURCE_NAME.title()} identifier')
+        return parser
+    
+    def _requested_command(self, argv: List[str]) -> Optional[str]:
+        """
+        Find the subcommand in argv without running argparse.
         
-        # Export command
-        parser_export = subparsers.add_parser('export', help=f'Export {self.RESOURCE_NAME_PLURAL}')
+        Args:
+            argv: Command line arguments
+            
+        Returns:
+            Subcommand name, or None if absent or help was requested
+        """
+        args = iter(argv)
+        for arg in args:
+            if arg in ('-h', '--help'):
+                return None
+            if arg in self._GLOBAL_VALUE_OPTIONS:
+                next(args, None)
+            elif not arg.startswith('-'):
+                return arg
+        return None
+    
+    def _add_list_parser(self, subparsers):
+        """Add the list subcommand"""
+        parser_list = subparsers.add_parser('list', help=self._HELP_LIST)
+        self.add_list_arguments(parser_list)
+    
+    def _add_search_parser(self, subparsers):
+        """Add the search subcommand"""
+        parser_search = subparsers.add_parser('search', help=self._HELP_SEARCH)
+        parser_search.add_argument('pattern', help='Search pattern (supports wildcards: *, ?)')
+    
+    def _add_enable_parser(self, subparsers):
+        """Add the enable subcommand"""
+        parser_enable = subparsers.add_parser('enable', help=self._HELP_ENABLE)
+        parser_enable.add_argument('identifier', help=self._HELP_IDENTIFIER)
+    
+    def _add_disable_parser(self, subparsers):
+        """Add the disable subcommand"""
+        parser_disable = subparsers.add_parser('disable', help=self._HELP_DISABLE)
+        parser_disable.add_argument('identifier', help=self._HELP_IDENTIFIER)
+    
+    def _add_export_parser(self, subparsers):
+        """Add the export subcommand"""
+        parser_export = subparsers.add_parser('export', help=self._HELP_EXPORT)
         parser_export.add_argument('--format', choices=['json', 'csv'], default='json', help='Export format')
         parser_export.add_argument('--output', '-o', help='Output file (default: stdout)')
-        
-        # Import command
-        parser_import = subparsers.add_parser('import', help=f'Import {self.RESOURCE_NAME_PLURAL}')
+    
+    def _add_import_parser(self, subparsers):
+        """Add the import subcommand"""
+        parser_import = subparsers.add_parser('import', help=self._HELP_IMPORT)
         parser_import.add_argument('--format', choices=['json', 'csv'], default='json', help='Import format')
         parser_import.add_argument('--file', '-f', help='Input file (default: stdin)')
         parser_import.add_argument('--overwrite', action='store_true', help='Overwrite existing entries')
-        
-        return parser
     
     def add_list_arguments(self, parser: argparse.ArgumentParser):
         """
@@ -116,8 +193,7 @@ class ResourceCLI:
             entries: List of entry dictionaries
         """
         # Default: print as simple list
-        for entry in entries:
-            print(entry)
+        write_lines([str(entry) for entry in entries])
     
     def cmd_search(self, manager: ResourceManager):
         """Search for entries"""
@@ -136,7 +212,7 @@ class ResourceCLI:
         entry = self.find_entry_by_identifier(manager, self.args.identifier)
         
         if not entry:
-            print(f"Error: {self.RESOURCE_NAME.title()} '{self.args.identifier}' not found", file=sys.stderr)
+            print(f"Error: {self.RESOURCE_NAME_TITLE} '{self.args.identifier}' not found", file=sys.stderr)
             sys.exit(1)
         
         manager.enable_entry(entry['.id'])
@@ -148,7 +224,7 @@ class ResourceCLI:
         entry = self.find_entry_by_identifier(manager, self.args.identifier)
         
         if not entry:
-            print(f"Error: {self.RESOURCE_NAME.title()} '{self.args.identifier}' not found", file=sys.stderr)
+            print(f"Error: {self.RESOURCE_NAME_TITLE} '{self.args.identifier}' not found", file=sys.stderr)
             sys.exit(1)
         
         manager.disable_entry(entry['.id'])
@@ -156,30 +232,31 @@ class ResourceCLI:
     
     def cmd_export(self, manager: ResourceManager):
         """Export entries"""
-        output = manager.export_entries(format=self.args.format)
-        
         if self.args.output:
-            with open(self.args.output, 'w') as f:
-                f.write(output)
+            # Written a piece at a time rather than built in memory
+            with open(self.args.output, 'w', encoding='utf-8') as f:
+                f.writelines(manager.iter_export(format=self.args.format))
             print(f"Exported {self.RESOURCE_NAME_PLURAL} to {self.args.output}")
         else:
-            print(output)
+            sys.stdout.writelines(manager.iter_export(format=self.args.format))
+            print()
     
     def cmd_import(self, manager: ResourceManager):
         """Import entries"""
-        # Read input
+        # Import, streaming from the input file or stdin
         if self.args.file:
-            with open(self.args.file, 'r') as f:
-                data = f.read()
+            with open(self.args.file, 'r', encoding='utf-8') as f:
+                stats = manager.import_entries(
+                    f,
+                    format=self.args.format,
+                    overwrite=self.args.overwrite
+                )
         else:
-            data = sys.stdin.read()
-        
-        # Import
-        stats = manager.import_entries(
-            data,
-            format=self.args.format,
-            overwrite=self.args.overwrite
-        )
+            stats = manager.import_entries(
+                sys.stdin,
+                format=self.args.format,
+                overwrite=self.args.overwrite
+            )
         
         print(f"Import complete:")
         print(f"  Added: {stats['added']}")
@@ -259,7 +336,10 @@ class ResourceCLI:
     
     def run(self):
         """Main entry point for CLI"""
-        # Create parser
+        argv = sys.argv[1:]
+        
+        # Create parser (argv is left for create_parser() to read from
+        # sys.argv, so overrides written as create_parser(self) still work)
         self.parser = self.create_parser()
         
         # Add resource-specific commands
@@ -270,7 +350,7 @@ class ResourceCLI:
                     break
         
         # Parse arguments
-        self.args = self.parser.parse_args()
+        self.args = self.parser.parse_args(argv)
         
         if not self.args.command:
             self.parser.print_help()
@@ -309,3 +389,6 @@ class ResourceCLI:
         except Exception as e:
             print(f"Error: {e}", file=sys.stderr)
             sys.exit(1)
+
+
+ResourceCLI._build_help_text()
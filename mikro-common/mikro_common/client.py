@@ -10,9 +10,7 @@ Website: https://github.com/munger
 Licence: MIT
 """
 
-import librouteros
-from librouteros.login import plain, token
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List
 
 
 class MikroTikClient:
@@ -36,6 +34,7 @@ class MikroTikClient:
         self.port = port if not use_ssl else 8729
         self.use_ssl = use_ssl
         self._api = None
+        self._path_cache: Dict[str, Any] = {}
     
     def __enter__(self):
         """Context manager entry"""
@@ -51,6 +50,10 @@ class MikroTikClient:
         if self._api:
             return
         
+        # Imported here so CLI startup doesn't pay for librouteros
+        import librouteros
+        from librouteros.login import plain
+        
         method = librouteros.connect_ssl if self.use_ssl else librouteros.connect
         
         self._api = method(
@@ -66,6 +69,7 @@ class MikroTikClient:
         if self._api:
             self._api.close()
             self._api = None
+        self._path_cache.clear()
     
     @property
     def api(self):
@@ -82,6 +86,10 @@ class MikroTikClient:
             path: RouterOS API path (e.g., '/ip/dns/static')
             
         Returns:
-            API path object
+            API path object (reused for the lifetime of the connection)
         """
-        return self.api.path(path)
+        obj = self._path_cache.get(path)
+        if obj is None:
+            obj = self.api.path(path)
+            self._path_cache[path] = obj
+        return obj
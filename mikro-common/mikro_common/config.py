@@ -11,18 +11,26 @@ Licence: MIT
 """
 
 import os
-import yaml
-from pathlib import Path
-from typing import Dict, Optional
+import stat
+import logging
+from typing import Dict, List, Optional
+from ._yaml_cache import (
+    _iter_yaml_entries, _preload_yaml, _safe_parse, _dir_signature, _dir_cached
+)
 
 
 CONFIG_DIR = "/etc/mikro-manager"
 
+logger = logging.getLogger(__name__)
+
 
 def load_routers() -> Dict[str, Dict]:
     """
     Load router configurations from /etc/mikro-manager/routers.d directory.
     
+    Results are reused for the rest of the process until a file in the
+    directory changes; edits made between CLI invocations are always seen.
+    
     Returns:
         Dictionary mapping router names to their configurations
         
@@ -32,7 +40,13 @@ def load_routers() -> Dict[str, Dict]:
     """
     router_dir = os.path.join(CONFIG_DIR, 'routers.d')
     
-    if not os.path.isdir(router_dir):
+    # Stat the directory once for both the existence and ownership checks
+    try:
+        dir_stat = os.stat(router_dir)
+    except OSError:
+        dir_stat = None
+    
+    if dir_stat is None or not stat.S_ISDIR(dir_stat.st_mode):
         raise FileNotFoundError(
             f"Router directory not found: {router_dir}\n"
             f"Create router configs in /etc/mikro-manager/routers.d/"
@@ -41,38 +55,30 @@ def load_routers() -> Dict[str, Dict]:
     # Security checks (skip if running as root)
     if os.geteuid() != 0:
         # Verify directory is owned by root
-        dir_stat = os.stat(router_dir)
         if dir_stat.st_uid != 0:
             raise PermissionError(
                 f"Security error: {router_dir} must be owned by root. "
                 f"Current owner UID: {dir_stat.st_uid}"
             )
     
-    # Load all .yaml files in alphabetical order
-    routers = {}
-    yaml_files = sorted(Path(router_dir).glob("*.yaml"))
+    entries = list(_iter_yaml_entries(router_dir))
+    return _load_routers_dir(router_dir, _dir_signature(entries), entries=entries)
+
+
+@_dir_cached
+def _load_routers_dir(router_dir: str, signature: tuple, entries: List) -> Dict[str, Dict]:
+    """Load routers.d from its scan, memoized on the directory signature"""
+    # Skip files not owned by root (security check)
+    if os.geteuid() != 0:
+        for _, yaml_file, st in entries:
+            if st.st_uid != 0:
+                logger.warning("Skipping %s - not owned by root (UID: %d)", yaml_file, st.st_uid)
+        entries = [entry for entry in entries if entry[2].st_uid == 0]
     
-    for yaml_file in yaml_files:
-        if yaml_file.name == 'README.md':
-            continue
-        
-        # Verify file is owned by root (security check)
-        if os.geteuid() != 0:
-            file_stat = os.stat(yaml_file)
-            if file_stat.st_uid != 0:
-                print(f"Warning: Skipping {yaml_file} - not owned by root (UID: {file_stat.st_uid})")
-                continue
-            
-        try:
-            with open(yaml_file, 'r') as f:
-                data = yaml.safe_load(f)
-                if data and 'router' in data:
-                    router = data['router']
-                    name = router.get('name')
-                    if name:
-                        routers[name] = router
-        except Exception as e:
-            print(f"Warning: Failed to load {yaml_file}: {e}")
+    # Load all .yaml files in alphabetical order
+    _preload_yaml(entries)
+    parsed = (_safe_parse(yaml_file, st, 'router', 'name') for _, yaml_file, st in entries)
+    routers = {name: router for name, router in filter(None, parsed)}
     
     if not routers:
         raise FileNotFoundError(f"No valid router configurations found in {router_dir}")
@@ -104,4 +110,4 @@ def get_router_config(routers: Dict[str, Dict], router_name: Optional[str] = Non
         return routers[router_name]
     
     # Use first router (default)
-    return list(routers.values())[0]
+    return next(iter(routers.values()))
@@ -10,13 +10,33 @@ Website: https://github.com/munger
 Licence: MIT
 """
 
-from typing import List, Dict, Optional
+import csv
+import fnmatch
+import io
+import itertools
+import json
+import re
+from typing import Any, Iterable, Iterator, List, Dict, Optional, TextIO, Union
 from .client import MikroTikClient
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_fnmatch_translate = fnmatch.translate
+
+
+# Maximum number of bulk commands sent ahead of their replies
+_PIPELINE_WINDOW = 64
+
 
 class ResourceManager:
     """Base class for managing MikroTik resources"""
     
+    # Fields find_entry() can look up by key instead of scanning
+    INDEXED_FIELDS = ('.id', 'name')
+    
     def __init__(self, client: MikroTikClient, resource_path: str):
         """
         Initialize resource manager.
@@ -27,21 +47,79 @@ class ResourceManager:
         """
         self.client = client
         self.resource_path = resource_path
+        self._cache: Optional[List[Dict]] = None
+        self._indexes: Dict[str, Dict[Any, Dict]] = {}
+        self._path = None
+        self._path_api = None
+    
+    @property
+    def path(self):
+        """API path object for this resource, reused while the connection is open"""
+        api = self.client.api
+        if self._path is None or self._path_api is not api:
+            self._path = self.client.get_path(self.resource_path)
+            self._path_api = api
+        return self._path
+    
+    def invalidate(self):
+        """Discard cached entries so the next read fetches them from the router"""
+        self._cache = None
+        self._indexes = {}
+    
+    def _index(self, field: str) -> Dict[Any, Dict]:
+        """
+        Get cached entries keyed by a field, building the index on first use.
+        
+        Args:
+            field: Field name (one of INDEXED_FIELDS)
+            
+        Returns:
+            Dictionary mapping field values to the first entry holding them
+        """
+        index = self._indexes.get(field)
+        if index is None:
+            index = {}
+            for entry in self.list_entries():
+                value = entry.get(field)
+                if value is not None:
+                    index.setdefault(value, entry)
+            self._indexes[field] = index
+        return index
     
     def list_entries(self) -> List[Dict]:
         """
         List all entries for this resource.
         
+        The result is cached until the next add, update or remove through
+        this manager (or an explicit invalidate()), and must not be modified.
+        
         Returns:
             List of dictionaries containing resource entries
         """
-        path = self.client.get_path(self.resource_path)
-        entries = []
+        if self._cache is None:
+            self._cache = list(self.iter_entries())
+        return self._cache
+    
+    def iter_entries(self) -> Iterator[Dict]:
+        """
+        Iterate over entries for this resource.
+        
+        Yields cached entries if list_entries() has already fetched them,
+        otherwise the router's rows without caching them. librouteros reads
+        the whole reply before returning it, so this only saves keeping a
+        cached copy: the full table is still transferred and held while
+        iterating, even if the caller stops early.
         
-        for entry in path:
-            entries.append(dict(entry))
+        Yields:
+            Resource entry dictionaries
+        """
+        if self._cache is not None:
+            yield from self._cache
+            return
         
-        return entries
+        # librouteros already returns plain dicts; only copy other mappings
+        for entry in self.path:
+            yield entry if type(entry) is dict else dict(entry)
     
     def get_entry(self, entry_id: str) -> Optional[Dict]:
         """
@@ -53,11 +131,7 @@ class ResourceManager:
         Returns:
             Entry dictionary or None if not found
         """
-        entries = self.list_entries()
-        for entry in entries:
-            if entry.get('.id') == entry_id:
-                return entry
-        return None
+        return self._find({'.id': entry_id})
     
     def find_entry(self, **kwargs) -> Optional[Dict]:
         """
@@ -69,12 +143,59 @@ class ResourceManager:
         Returns:
             First matching entry or None
         """
-        entries = self.list_entries()
-        for entry in entries:
-            match = all(entry.get(k) == v for k, v in kwargs.items())
-            if match:
-                return entry
-        return None
+        return self._find(kwargs)
+    
+    def _find(self, kwargs: Dict[str, Any]) -> Optional[Dict]:
+        """
+        Find the first entry matching the given field values.
+        
+        Kept separate from find_entry() so get_entry() still works when a
+        subclass overrides find_entry() with a different signature.
+        
+        Args:
+            kwargs: Field values to match
+            
+        Returns:
+            First matching entry or None
+        """
+        if self._cache is not None:
+            if len(kwargs) == 1:
+                field, value = next(iter(kwargs.items()))
+                if field in self.INDEXED_FIELDS and value is not None:
+                    return self._index(field).get(value)
+        elif kwargs and None not in kwargs.values():
+            # Nothing cached - let the router do the filtering
+            rows = self._query(**kwargs)
+            if rows is not None:
+                return next(iter(rows), None)
+        
+        items = tuple(kwargs.items())
+        return next(
+            (entry for entry in self.iter_entries() if all(entry.get(k) == v for k, v in items)),
+            None
+        )
+    
+    def _query(self, **kwargs) -> Optional[Iterable[Dict]]:
+        """
+        Fetch only the entries matching the given field values.
+        
+        Args:
+            **kwargs: Field values to match
+            
+        Returns:
+            Matching rows, or None if the API doesn't support queries
+        """
+        path = self.path
+        try:
+            from librouteros.query import Key, And
+        except ImportError:
+            return None
+        if not hasattr(path, 'select'):
+            return None
+        
+        conditions = [Key(field) == value for field, value in kwargs.items()]
+        where = And(*conditions) if len(conditions) > 1 else conditions[0]
+        return path.select().where(where)
     
     def add_entry(self, **kwargs) -> str:
         """
@@ -86,8 +207,9 @@ class ResourceManager:
         Returns:
             Entry ID of created entry
         """
-        path = self.client.get_path(self.resource_path)
+        path = self.path
         result = path.add(**kwargs)
+        self.invalidate()
         return result
     
     def update_entry(self, entry_id: str, **kwargs) -> bool:
@@ -101,8 +223,9 @@ class ResourceManager:
         Returns:
             True if updated successfully
         """
-        path = self.client.get_path(self.resource_path)
+        path = self.path
         path.update(**{'.id': entry_id, **kwargs})
+        self.invalidate()
         return True
     
     def remove_entry(self, entry_id: str) -> bool:
@@ -115,8 +238,114 @@ class ResourceManager:
         Returns:
             True if removed successfully
         """
-        path = self.client.get_path(self.resource_path)
+        path = self.path
         path.remove(entry_id)
+        self.invalidate()
+        return True
+    
+    def _pipeline(self, cmd: str, rows: List[Dict]) -> List[Dict]:
+        """
+        Run a command once per row, sending commands ahead of the replies.
+        
+        Commands are tagged so replies can be matched up, with at most
+        _PIPELINE_WINDOW in flight at once. Falls back to one call at a
+        time if the API object doesn't expose its protocol.
+        
+        Args:
+            cmd: Command to run under the resource path (e.g., 'add')
+            rows: Command arguments for each call
+            
+        Returns:
+            Final reply attributes for each row, in order
+            
+        Raises:
+            TrapError: If a command failed (raised once all replies are read)
+        """
+        path = self.path
+        api = getattr(path, 'api', None)
+        protocol = getattr(api, 'protocol', None)
+        
+        if protocol is None:
+            results = []
+            for row in rows:
+                replies = list(path(cmd, **row))
+                results.append(replies[-1] if replies else {})
+            return results
+        
+        from librouteros.exceptions import MultiTrapError, TrapError
+        from librouteros.protocol import compose_word, parse_word
+        
+        command = path.join(cmd).path
+        results = [{} for _ in rows]
+        traps = []
+        
+        def read_reply() -> bool:
+            # Read from the protocol directly: Api.readSentence() can't
+            # parse the '.tag=N' word
+            reply_word, raw_words = protocol.readSentence()
+            tag = None
+            words = {}
+            for word in raw_words:
+                if word.startswith('.tag='):
+                    tag = int(word[len('.tag='):])
+                else:
+                    key, value = parse_word(word)
+                    words[key] = value
+            if reply_word == '!trap':
+                traps.append(TrapError(**words))
+            elif words:
+                results[tag] = words
+            return reply_word == '!done'
+        
+        pending = 0
+        for tag, row in enumerate(rows):
+            words = [compose_word(key, value) for key, value in row.items()]
+            protocol.writeSentence(command, *words, f'.tag={tag}')
+            pending += 1
+            while pending >= _PIPELINE_WINDOW:
+                pending -= read_reply()
+        while pending:
+            pending -= read_reply()
+        
+        if len(traps) > 1:
+            raise MultiTrapError(*traps)
+        if traps:
+            raise traps[0]
+        return results
+    
+    def bulk_add(self, rows: List[Dict]) -> List[str]:
+        """
+        Add several entries in one pipelined batch.
+        
+        Args:
+            rows: Entry fields for each new entry
+            
+        Returns:
+            Entry IDs of the created entries, in order
+        """
+        if not rows:
+            return []
+        try:
+            return [str(reply.get('ret') or '') for reply in self._pipeline('add', rows)]
+        finally:
+            self.invalidate()
+    
+    def bulk_update(self, rows: List[Dict]) -> bool:
+        """
+        Update several entries in one pipelined batch.
+        
+        Args:
+            rows: Fields to update for each entry, including its '.id'
+            
+        Returns:
+            True if updated successfully
+        """
+        if not rows:
+            return True
+        try:
+            self._pipeline('set', rows)
+        finally:
+            self.invalidate()
         return True
     
     def enable_entry(self, entry_id: str) -> bool:
@@ -167,7 +396,6 @@ class ResourceManager:
         Returns:
             List of matching entries
         """
-        import fnmatch
         entries = self.list_entries()
         
         if not fields:
@@ -176,52 +404,101 @@ class ResourceManager:
             if entries:
                 fields = [k for k, v in entries[0].items() if isinstance(v, str)]
         
+        if any(c in pattern for c in '*?['):
+            # Translate and compile the pattern once rather than per value
+            match = re.compile(_fnmatch_translate(pattern)).match
+        else:
+            # No wildcards - the pattern only matches itself
+            match = pattern.__eq__
+        
         matching = []
         for entry in entries:
             for field in fields:
                 value = entry.get(field, '')
-                if isinstance(value, str) and fnmatch.fnmatch(value, pattern):
+                if isinstance(value, str) and match(value):
                     matching.append(entry)
                     break
         
         return matching
     
-    def export_entries(self, format: str = 'json') -> str:
+    def export_entries(self, format: str = 'json', out: Optional[TextIO] = None) -> Optional[str]:
         """
         Export entries to JSON or CSV format.
         
         Args:
             format: Export format ('json' or 'csv')
+            out: Writable text stream to write to (default: return a string)
             
         Returns:
-            Formatted string of entries
+            Formatted string of entries, or None if written to out
         """
-        entries = self.list_entries()
+        chunks = self.iter_export(format)
         
-        if format == 'json':
-            import json
-            return json.dumps(entries, indent=2)
+        if out is None:
+            return ''.join(chunks)
         
-        elif format == 'csv':
-            import csv
-            import io
-            output = io.StringIO()
-            if entries:
-                writer = csv.DictWriter(output, fieldnames=entries[0].keys())
-                writer.writeheader()
-                writer.writerows(entries)
-            return output.getvalue()
+        out.writelines(chunks)
+        return None
+    
+    def export_entries_bytes(self) -> bytes:
+        """
+        Export entries to JSON as UTF-8 encoded bytes.
         
-        else:
-            raise ValueError(f"Unsupported format: {format}")
+        Produces the same document as export_entries('json'), formatted
+        from iter_entries() without filling the cache. The whole document
+        is built in memory; use iter_export() to write a large table a
+        piece at a time.
+        
+        Returns:
+            Encoded JSON document
+        """
+        return ''.join(_iter_json(self.iter_entries())).encode('utf-8')
+    
+    def iter_export(self, format: str = 'json') -> Iterator[str]:
+        """
+        Export entries to JSON or CSV format a piece at a time.
+        
+        The pieces join up to the same text export_entries() returns, with
+        one piece per entry (JSON) or row (CSV). Entries are formatted as
+        iter_entries() produces them, so no list of entries is built unless
+        one is already cached.
+        
+        Args:
+            format: Export format ('json' or 'csv')
+            
+        Returns:
+            Iterator of formatted text pieces
+        """
+        if format == 'json':
+            return _iter_json(self.iter_entries())
+        if format == 'csv':
+            return _iter_csv(self.iter_entries())
+        raise ValueError(f"Unsupported format: {format}")
+    
+    def _entry_id(self, entry: Dict) -> Optional[str]:
+        """Get the API ID of an entry returned by list_entries()"""
+        return entry.get('.id')
     
-    def import_entries(self, data: str, format: str = 'json', 
+    def _import_fields(self, entry: Dict) -> Dict:
+        """
+        Turn an imported entry into fields to add or set.
+        
+        Args:
+            entry: Entry read from an import file
+            
+        Returns:
+            Fields for the API, without internal fields such as '.id'
+        """
+        entry.pop('.id', None)
+        return entry
+    
+    def import_entries(self, data: Union[str, TextIO], format: str = 'json', 
                       overwrite: bool = False, key_field: str = 'name') -> Dict[str, int]:
         """
         Import entries from JSON or CSV format.
         
         Args:
-            data: Data string to import
+            data: Data string or readable text stream to import
             format: Import format ('json' or 'csv')
             overwrite: Whether to overwrite existing entries
             key_field: Field name to use for matching existing entries
@@ -229,41 +506,118 @@ class ResourceManager:
         Returns:
             Dictionary with counts: {'added': N, 'updated': N, 'skipped': N}
         """
-        import json
-        import csv
-        import io
+        if isinstance(data, str):
+            data = io.StringIO(data)
         
-        # Parse data
+        # Parse data (CSV rows are read from the stream as they are imported)
         if format == 'json':
-            entries = json.loads(data)
+            entries = orjson.loads(data.read()) if orjson is not None else json.load(data)
         elif format == 'csv':
-            reader = csv.DictReader(io.StringIO(data))
-            entries = list(reader)
+            entries = csv.DictReader(data)
         else:
             raise ValueError(f"Unsupported format: {format}")
         
         stats = {'added': 0, 'updated': 0, 'skipped': 0}
         
+        # Fetch existing entries once and look them up by key (as str, since
+        # librouteros returns numeric-looking values as int)
+        existing_by_key = {}
+        for existing in self.list_entries():
+            value = existing.get(key_field)
+            if value is not None:
+                existing_by_key.setdefault(str(value), existing)
+        
+        # Changes are collected and sent in two batches; repeated keys are
+        # merged into a single change
+        updates: Dict[str, Dict] = {}
+        additions: Dict[str, Dict] = {}
+        
         for entry in entries:
-            # Remove internal fields
-            entry.pop('.id', None)
+            entry = self._import_fields(entry)
             
             # Check if entry exists
             key_value = entry.get(key_field)
-            if not key_value:
+            if key_value is None or key_value == '':
                 stats['skipped'] += 1
                 continue
+            key_value = str(key_value)
             
-            existing = self.find_entry(**{key_field: key_value})
+            existing = existing_by_key.get(key_value)
             
-            if existing:
+            if existing or key_value in additions:
                 if overwrite:
-                    self.update_entry(existing['.id'], **entry)
+                    if existing:
+                        entry_id = self._entry_id(existing)
+                        updates.setdefault(entry_id, {'.id': entry_id}).update(entry)
+                    else:
+                        additions[key_value].update(entry)
                     stats['updated'] += 1
                 else:
                     stats['skipped'] += 1
             else:
-                self.add_entry(**entry)
+                additions[key_value] = entry
                 stats['added'] += 1
         
+        self.bulk_update(list(updates.values()))
+        self.bulk_add(list(additions.values()))
+        
         return stats
+
+
+class _LineWriter:
+    """File-like target for a csv writer that keeps the last line written"""
+    
+    line = ''
+    
+    def write(self, line: str) -> int:
+        self.line = line
+        return len(line)
+
+
+def _iter_json(entries: Iterable[Dict]) -> Iterator[str]:
+    """Format entries as an indented JSON array, one entry at a time"""
+    if orjson is not None:
+        def dumps(entry):
+            return orjson.dumps(entry, option=orjson.OPT_INDENT_2).decode()
+    else:
+        def dumps(entry):
+            return json.dumps(entry, indent=2, ensure_ascii=False)
+    
+    prefix = '[\n  '
+    for entry in entries:
+        # Nest each entry one level into the array
+        yield prefix + dumps(entry).replace('\n', '\n  ')
+        prefix = ',\n  '
+    
+    yield '\n]' if prefix != '[\n  ' else '[]'
+
+
+def _iter_csv(entries: Iterable[Dict]) -> Iterator[str]:
+    """
+    Format entries as CSV lines, using the first entry's fields as columns.
+    
+    Raises:
+        ValueError: If a later entry has a field the first entry lacks
+            (as csv.DictWriter does), rather than dropping its values
+    """
+    entries = iter(entries)
+    first = next(entries, None)
+    if first is None:
+        return
+    
+    fieldnames = tuple(first)
+    columns = first.keys()
+    line = _LineWriter()
+    writer = csv.writer(line)
+    writer.writerow(fieldnames)
+    yield line.line
+    
+    # Build positional rows directly; fields missing from an entry are
+    # left empty
+    for entry in itertools.chain((first,), entries):
+        if not entry.keys() <= columns:
+            extra = ", ".join(repr(field) for field in entry if field not in columns)
+            raise ValueError(f"dict contains fields not in fieldnames: {extra}")
+        get = entry.get
+        writer.writerow([get(field, '') for field in fieldnames])
+        yield line.line
@@ -22,6 +22,9 @@ setup(
         "librouteros>=3.1.0",
         "PyYAML>=6.0",
     ],
+    extras_require={
+        "orjson": ["orjson>=3.0"],
+    },
     python_requires=">=3.8",
     classifiers=[
         "Development Status :: 3 - Alpha",
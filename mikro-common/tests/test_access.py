@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+test_access.py
+
+  MikroTik management tools
+
+Copyright (c) 2025 Tim Hosking
+Email: tim@mungerware.com
+Website: https://github.com/munger
+Licence: MIT
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from mikro_common import access, _yaml_cache
+
+
+class ConfigTestCase(unittest.TestCase):
+    """Base class running against a temporary /etc/mikro-manager."""
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.config_dir)
+        _yaml_cache.clear_caches()
+        self.addCleanup(_yaml_cache.clear_caches)
+        patch = mock.patch.object(access, 'CONFIG_DIR', self.config_dir)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def write(self, relpath, text):
+        """Write a config file, creating its directory."""
+        path = os.path.join(self.config_dir, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def add_group(self, name, modules, access_level='read-write'):
+        """Write a groups.d file."""
+        self.write(f'groups.d/{name}.yaml',
+                   f"group:\n  name: {name}\n  modules: {modules}\n  access: {access_level}\n")
+
+    def add_user(self, username, groups):
+        """Write a users.d file with the given group list (YAML flow syntax)."""
+        self.write(f'users.d/{username}.yaml',
+                   f"user:\n  username: {username}\n  permissions:\n    - groups: {groups}\n")
+
+    def check(self, permission, username='alice'):
+        """Run check_permission as a non-root user."""
+        with mock.patch.object(access.os, 'geteuid', return_value=1000), \
+                mock.patch.object(access, 'get_current_user', return_value=username):
+            return access.check_permission(permission)
+
+
+class TestCheckPermission(ConfigTestCase):
+    """Test check_permission against users.d and groups.d."""
+
+    def test_exact_grant(self):
+        """Test a group grants exactly its modules and access level."""
+        self.add_group('dns-admin', '[dns]')
+        self.add_user('alice', '[dns-admin]')
+        self.assertTrue(self.check('dns:read'))
+        self.assertTrue(self.check('dns:write'))
+        self.assertFalse(self.check('firewall:read'))
+
+    def test_access_level(self):
+        """Test a read-only group doesn't grant write."""
+        self.add_group('dns-view', '[dns]', 'read-only')
+        self.add_user('alice', '[dns-view]')
+        self.assertTrue(self.check('dns:read'))
+        self.assertFalse(self.check('dns:write'))
+
+    def test_global_wildcard(self):
+        """Test a group with modules '*' grants everything."""
+        self.add_group('admins', '"*"')
+        self.add_user('alice', '[admins]')
+        self.assertTrue(self.check('dns:write'))
+        self.assertTrue(self.check('firewall:read'))
+
+    def test_string_override(self):
+        """Test the "group:access" form overrides the group's access level."""
+        self.add_group('dns-admin', '[dns]')
+        self.add_user('alice', '["dns-admin:read-only"]')
+        self.assertTrue(self.check('dns:read'))
+        self.assertFalse(self.check('dns:write'))
+
+    def test_dict_override(self):
+        """Test the {name, access} form overrides the group's access level."""
+        self.add_group('dns-admin', '[dns]', 'read-only')
+        self.add_user('alice', '[{name: dns-admin, access: write-only}]')
+        self.assertFalse(self.check('dns:read'))
+        self.assertTrue(self.check('dns:write'))
+
+    def test_unknown_user(self):
+        """Test users missing from users.d get nothing, without reading groups.d."""
+        self.add_group('admins', '"*"')
+        self.add_user('alice', '[admins]')
+        with mock.patch.object(access, '_load_groups_dir') as load_groups:
+            self.assertFalse(self.check('dns:read', username='mallory'))
+        load_groups.assert_not_called()
+
+    def test_no_users(self):
+        """Test everyone has access when no users are configured."""
+        self.assertTrue(self.check('dns:write'))
+        os.makedirs(os.path.join(self.config_dir, 'users.d'))
+        self.add_group('dns-view', '[dns]', 'read-only')
+        with mock.patch.object(access, '_load_groups_dir') as load_groups:
+            self.assertTrue(self.check('dns:write'))
+        load_groups.assert_not_called()
+
+    def test_config_change(self):
+        """Test edits to groups.d are seen by the next check."""
+        self.add_group('dns-admin', '[dns]', 'read-only')
+        self.add_user('alice', '[dns-admin]')
+        self.assertFalse(self.check('dns:write'))
+        self.add_group('dns-admin', '[dns, firewall]', 'read-write')
+        self.assertTrue(self.check('dns:write'))
+        self.assertTrue(self.check('firewall:read'))
+
+
+class TestPermissionTables(ConfigTestCase):
+    """Test check_permission's handling of permission index entries."""
+
+    def check_index(self, perms, permission):
+        """Check a permission for a user holding the given permission strings."""
+        tables = access._build_permission_tables({'alice': frozenset(perms)}, False)
+        with mock.patch.object(access, '_load_permission_tables', return_value=tables):
+            return self.check(permission)
+
+    def test_exact(self):
+        """Test an exact permission only matches itself."""
+        self.assertTrue(self.check_index({'dns:read'}, 'dns:read'))
+        self.assertFalse(self.check_index({'dns:read'}, 'dns:write'))
+        self.assertFalse(self.check_index({'dns:read'}, 'firewall:read'))
+
+    def test_module_wildcard(self):
+        """Test 'module:*' matches every action on that module only."""
+        self.assertTrue(self.check_index({'dns:*'}, 'dns:read'))
+        self.assertTrue(self.check_index({'dns:*'}, 'dns:write'))
+        self.assertFalse(self.check_index({'dns:*'}, 'firewall:read'))
+
+    def test_global_wildcard(self):
+        """Test '*' matches any permission."""
+        self.assertTrue(self.check_index({'*'}, 'firewall:write'))
+
+    def test_no_permissions(self):
+        """Test a user with no permissions is denied."""
+        self.assertFalse(self.check_index(set(), 'dns:read'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+test_cli.py
+
+  MikroTik management tools
+
+Copyright (c) 2025 Tim Hosking
+Email: tim@mungerware.com
+Website: https://github.com/munger
+Licence: MIT
+"""
+
+import unittest
+from unittest import mock
+
+from mikro_common.cli import ResourceCLI
+
+
+class Stop(Exception):
+    """Raised to stop run() once arguments are parsed."""
+
+
+class TestRun(unittest.TestCase):
+    """Test ResourceCLI.run() up to argument parsing."""
+
+    def run_cli(self, cli_class, argv):
+        """Run a CLI class with the given arguments, stopping before the permission check."""
+        cli = cli_class()
+        with mock.patch('sys.argv', ['mikro-test'] + argv), \
+                mock.patch.object(cli_class, 'check_permissions', side_effect=Stop):
+            with self.assertRaises(Stop):
+                cli.run()
+        return cli
+
+    def test_create_parser_without_argv(self):
+        """Test subclasses overriding create_parser(self) without argv still run."""
+        class LegacyCLI(ResourceCLI):
+            def create_parser(self):
+                parser = super().create_parser()
+                parser.add_argument('--extra', action='store_true')
+                return parser
+
+        cli = self.run_cli(LegacyCLI, ['--extra', 'list'])
+        self.assertEqual(cli.args.command, 'list')
+        self.assertTrue(cli.args.extra)
+
+    def test_requested_subcommand(self):
+        """Test a common subcommand is parsed from sys.argv."""
+        cli = self.run_cli(ResourceCLI, ['export', '--format', 'csv'])
+        self.assertEqual(cli.args.command, 'export')
+        self.assertEqual(cli.args.format, 'csv')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -31,6 +31,11 @@ class TestImports(unittest.TestCase):
         from mikro_common import client
         self.assertTrue(hasattr(client, 'MikroTikClient'))
 
+    def test_import_yaml_cache(self):
+        """Test YAML cache module imports."""
+        from mikro_common import _yaml_cache
+        self.assertTrue(hasattr(_yaml_cache, '_load_yaml_cached'))
+
 
 if __name__ == '__main__':
     unittest.main()
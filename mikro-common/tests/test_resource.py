@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+test_resource.py
+
+  MikroTik management tools
+
+Copyright (c) 2025 Tim Hosking
+Email: tim@mungerware.com
+Website: https://github.com/munger
+Licence: MIT
+"""
+
+import json
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from librouteros.exceptions import MultiTrapError, TrapError
+
+from mikro_common import resource
+from mikro_common.resource import ResourceManager
+
+
+class FakeProtocol:
+    """
+    Stand-in for librouteros' wire protocol.
+
+    Each written sentence is answered by respond(command, attributes),
+    which returns the reply sentences for it as (reply word, {key: value}).
+    Replies are delivered newest command first, so replies to pipelined
+    commands arrive out of order.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.sent = []
+        self.queued = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def writeSentence(self, cmd, *words):
+        attrs = {}
+        tag = None
+        for word in words:
+            if word.startswith('.tag='):
+                tag = word[len('.tag='):]
+            else:
+                key, _, value = word[1:].partition('=')
+                attrs[key] = value
+        self.sent.append((cmd, attrs))
+        self.queued.append((tag, self.respond(cmd, attrs)))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def readSentence(self):
+        tag, replies = self.queued[-1]
+        reply_word, attrs = replies.pop(0)
+        if not replies:
+            self.queued.pop()
+        if reply_word == '!done':
+            self.in_flight -= 1
+        words = [f'={key}={value}' for key, value in attrs.items()]
+        return reply_word, words + [f'.tag={tag}']
+
+
+class FakePath:
+    """Minimal librouteros Path exposing api.protocol."""
+
+    def __init__(self, path, api):
+        self.path = path
+        self.api = api
+
+    def join(self, *parts):
+        return FakePath('/'.join((self.path,) + parts), self.api)
+
+
+def make_manager(respond):
+    """Create a ResourceManager whose API is backed by a FakeProtocol."""
+    protocol = FakeProtocol(respond)
+    api = SimpleNamespace(protocol=protocol)
+    client = SimpleNamespace(api=api, get_path=lambda path: FakePath(path, api))
+    return ResourceManager(client, '/ip/dns/static'), protocol
+
+
+def add_reply(cmd, attrs):
+    """Answer 'add' like RouterOS: !done carrying the new ID."""
+    return [('!done', {'ret': '*' + attrs['name']})]
+
+
+class TestPipeline(unittest.TestCase):
+    """Test the tagged command pipeline behind bulk_add/bulk_update."""
+
+    def test_tag_routing(self):
+        """Test out-of-order replies are matched to their rows by tag."""
+        manager, protocol = make_manager(add_reply)
+        ids = manager.bulk_add([{'name': str(i)} for i in range(10)])
+        self.assertEqual(ids, ['*' + str(i) for i in range(10)])
+        self.assertEqual([cmd for cmd, _ in protocol.sent], ['/ip/dns/static/add'] * 10)
+
+    def test_missing_ret(self):
+        """Test bulk_add returns strings even when a reply has no ID."""
+        manager, _ = make_manager(lambda cmd, attrs: [('!done', {})])
+        self.assertEqual(manager.bulk_add([{'name': 'a'}]), [''])
+
+    def test_trap_then_done(self):
+        """Test a !trap followed by !done on the same tag raises once all replies are read."""
+        def respond(cmd, attrs):
+            if attrs['name'] == 'bad':
+                return [('!trap', {'message': 'failure: bad'}), ('!done', {})]
+            return add_reply(cmd, attrs)
+
+        manager, protocol = make_manager(respond)
+        with self.assertRaises(TrapError) as ctx:
+            manager.bulk_add([{'name': 'a'}, {'name': 'bad'}, {'name': 'b'}])
+        self.assertNotIsInstance(ctx.exception, MultiTrapError)
+        self.assertEqual(ctx.exception.message, 'failure: bad')
+        self.assertEqual(protocol.in_flight, 0)
+        self.assertEqual(protocol.queued, [])
+
+    def test_multi_trap(self):
+        """Test several failed commands raise a MultiTrapError."""
+        def respond(cmd, attrs):
+            return [('!trap', {'message': 'failure: ' + attrs['name']}), ('!done', {})]
+
+        manager, protocol = make_manager(respond)
+        with self.assertRaises(MultiTrapError) as ctx:
+            manager.bulk_update([{'.id': '*1', 'name': 'a'}, {'.id': '*2', 'name': 'b'}])
+        self.assertEqual(sorted(trap.message for trap in ctx.exception.traps),
+                         ['failure: a', 'failure: b'])
+        self.assertEqual(protocol.in_flight, 0)
+
+    def test_window(self):
+        """Test no more than _PIPELINE_WINDOW commands are in flight."""
+        manager, protocol = make_manager(add_reply)
+        count = resource._PIPELINE_WINDOW * 3 + 5
+        ids = manager.bulk_add([{'name': str(i)} for i in range(count)])
+        self.assertEqual(ids, ['*' + str(i) for i in range(count)])
+        self.assertEqual(protocol.max_in_flight, resource._PIPELINE_WINDOW)
+        self.assertEqual(protocol.in_flight, 0)
+
+    def test_invalidates(self):
+        """Test the entry cache is dropped after a batch, even one that fails."""
+        manager, _ = make_manager(lambda cmd, attrs: [('!trap', {'message': 'x'}), ('!done', {})])
+        manager._cache = []
+        with self.assertRaises(TrapError):
+            manager.bulk_add([{'name': 'a'}])
+        self.assertIsNone(manager._cache)
+
+
+class TestCsvExport(unittest.TestCase):
+    """Test CSV exports."""
+
+    def export(self, rows):
+        """Export the given rows as CSV."""
+        manager, _ = make_manager(add_reply)
+        manager._cache = rows
+        return manager.export_entries('csv')
+
+    def test_columns_from_first_entry(self):
+        """Test columns come from the first entry and missing fields are empty."""
+        csv_text = self.export([{'.id': '*1', 'name': 'a', 'comment': 'x'}, {'.id': '*2', 'name': 'b'}])
+        self.assertEqual(csv_text.splitlines(), ['.id,name,comment', '*1,a,x', '*2,b,'])
+
+    def test_extra_field(self):
+        """Test a field missing from the first entry raises instead of being dropped."""
+        with self.assertRaises(ValueError):
+            self.export([{'.id': '*1', 'name': 'a'}, {'.id': '*2', 'name': 'b', 'comment': 'x'}])
+
+
+class TestJsonExport(unittest.TestCase):
+    """Test JSON exports."""
+
+    def setUp(self):
+        self.manager, _ = make_manager(add_reply)
+        self.rows = [{'.id': '*1', 'name': 'café', 'ttl': 300}, {'.id': '*2', 'name': 'b', 'disabled': True}]
+        self.manager._cache = self.rows
+
+    def test_round_trip(self):
+        """Test the export parses back to the entries."""
+        self.assertEqual(json.loads(self.manager.export_entries('json')), self.rows)
+
+    def test_bytes(self):
+        """Test export_entries_bytes is the UTF-8 encoded JSON export."""
+        data = self.manager.export_entries_bytes()
+        self.assertEqual(data, self.manager.export_entries('json').encode('utf-8'))
+        self.assertIn('café'.encode('utf-8'), data)
+        with mock.patch.object(resource, 'orjson', None):
+            self.assertEqual(self.manager.export_entries_bytes(), data)
+
+    def test_empty(self):
+        """Test an empty table exports as an empty array."""
+        self.manager._cache = []
+        self.assertEqual(self.manager.export_entries_bytes(), b'[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+test_yaml_cache.py
+
+  MikroTik management tools
+
+Copyright (c) 2025 Tim Hosking
+Email: tim@mungerware.com
+Website: https://github.com/munger
+Licence: MIT
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from mikro_common import access, _yaml_cache
+
+
+class TestBatchedParsing(unittest.TestCase):
+    """Test that batching files into one YAML stream doesn't change the result."""
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.config_dir)
+        os.mkdir(os.path.join(self.config_dir, 'users.d'))
+        _yaml_cache.clear_caches()
+        self.addCleanup(_yaml_cache.clear_caches)
+        patch = mock.patch.object(access, 'CONFIG_DIR', self.config_dir)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def write(self, name, text):
+        """Write a users.d file."""
+        path = os.path.join(self.config_dir, 'users.d', name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return os.path.abspath(path)
+
+    def user(self, username, marker=''):
+        """YAML for a user file, optionally starting with a document marker."""
+        return f"{marker}user:\n  username: {username}\n"
+
+    def preload(self):
+        """Run the batched parse over users.d."""
+        entries = list(_yaml_cache._iter_yaml_entries(os.path.join(self.config_dir, 'users.d')))
+        _yaml_cache._preload_yaml(entries)
+
+    def test_multi_document_file(self):
+        """Test a multi-document file next to a comment-only file doesn't shift documents."""
+        self.write('00-placeholder.yaml', "# add users below\n")
+        self.write('10-bob.yaml', self.user('bob') + "---\n" + self.user('carol'))
+        self.write('20-dave.yaml', self.user('dave'))
+        self.write('30-erin.yaml', self.user('erin'))
+        with self.assertLogs(_yaml_cache.logger, 'WARNING'):
+            users = access.load_users()
+        self.assertEqual(sorted(users), ['dave', 'erin'])
+
+    def test_comment_only_file(self):
+        """Test a comment-only file is cached as an empty document."""
+        placeholder = self.write('00-placeholder.yaml', "# add users below\n")
+        self.write('10-bob.yaml', self.user('bob'))
+        self.write('20-dave.yaml', self.user('dave'))
+        self.preload()
+        self.assertIsNone(_yaml_cache._YAML_CACHE[placeholder][2])
+        self.assertEqual(sorted(access.load_users()), ['bob', 'dave'])
+
+    def test_leading_marker(self):
+        """Test files starting with '---' are still parsed in one batch."""
+        paths = [self.write(f'{name}.yaml', self.user(name, '# header\n---\n'))
+                 for name in ('bob', 'carol', 'dave')]
+        yaml = _yaml_cache._get_yaml()
+        with mock.patch.object(yaml, 'load', side_effect=AssertionError("parsed per file")):
+            self.preload()
+        for path, name in zip(paths, ('bob', 'carol', 'dave')):
+            self.assertEqual(_yaml_cache._YAML_CACHE[path][2], {'user': {'username': name}})
+
+    def test_batch_content(self):
+        """Test which files can be joined into a batch."""
+        self.assertEqual(_yaml_cache._batch_content(b"a: 1\n"), b"a: 1\n")
+        self.assertEqual(_yaml_cache._batch_content(b"# c\n--- # doc\na: 1\n"), b"a: 1\n")
+        self.assertIsNone(_yaml_cache._batch_content(b"a: 1\n---\nb: 2\n"))
+        self.assertIsNone(_yaml_cache._batch_content(b"a: 1\n...\n"))
+        self.assertIsNone(_yaml_cache._batch_content(b"--- {a: 1}\n"))
+        self.assertIsNone(_yaml_cache._batch_content(b"%YAML 1.1\n---\na: 1\n"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,10 +13,24 @@ Licence: MIT
 import sys
 import argparse
 import socket
-from mikro_common import MikroTikClient, load_routers, get_router_config, require_permission, AccessDeniedError
+from operator import itemgetter
+from mikro_common import (
+    MikroTikClient, load_routers, get_router_config, require_permission, AccessDeniedError,
+    write_lines
+)
 from .dns import DNSManager
 
 
+_by_name = itemgetter('name')
+
+
+def _format_entry(entry):
+    """Format a DNS entry as a table row"""
+    disabled = " (disabled)" if entry['disabled'] else ""
+    comment = entry.get('comment') or ''
+    return f"{entry['name']:<40} {entry['address']:<15} {entry['ttl']:<10} {comment:<30}{disabled}"
+
+
 def cmd_list(args, dns_manager):
     """List all DNS entries"""
     entries = dns_manager.list_entries()
@@ -30,10 +44,7 @@ def cmd_list(args, dns_manager):
     print("-" * 100)
     
     # Print entries
-    for entry in sorted(entries, key=lambda x: x['name']):
-        disabled = " (disabled)" if entry['disabled'] else ""
-        comment = entry.get('comment') or ''
-        print(f"{entry['name']:<40} {entry['address']:<15} {entry['ttl']:<10} {comment:<30}{disabled}")
+    write_lines([_format_entry(entry) for entry in sorted(entries, key=_by_name)])
 
 
 def cmd_add(args, dns_manager):
@@ -118,10 +129,7 @@ def cmd_search(args, dns_manager):
     print(f"{'Name':<40} {'Address':<15} {'TTL':<10} {'Comment':<30}")
     print("-" * 100)
     
-    for entry in sorted(entries, key=lambda x: x['name']):
-        disabled = " (disabled)" if entry['disabled'] else ""
-        comment = entry.get('comment') or ''
-        print(f"{entry['name']:<40} {entry['address']:<15} {entry['ttl']:<10} {comment:<30}{disabled}")
+    write_lines([_format_entry(entry) for entry in sorted(entries, key=_by_name)])
 
 
 def cmd_enable(args, dns_manager):
@@ -167,26 +175,24 @@ def cmd_validate(args, dns_manager):
 
 def cmd_export(args, dns_manager):
     """Export DNS entries"""
-    output = dns_manager.export_entries(format=args.format)
-    
     if args.output:
-        with open(args.output, 'w') as f:
-            f.write(output)
+        # Written a piece at a time rather than built in memory
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.writelines(dns_manager.iter_export(format=args.format))
         print(f"Exported to {args.output}")
     else:
-        print(output)
+        sys.stdout.writelines(dns_manager.iter_export(format=args.format))
+        print()
 
 
 def cmd_import(args, dns_manager):
     """Import DNS entries"""
     if args.file:
-        with open(args.file, 'r') as f:
-            data = f.read()
+        with open(args.file, 'r', encoding='utf-8') as f:
+            stats = dns_manager.import_entries(f, format=args.format, overwrite=args.overwrite)
     else:
         print("Reading from stdin...")
-        data = sys.stdin.read()
-    
-    stats = dns_manager.import_entries(data, format=args.format, overwrite=args.overwrite)
+        stats = dns_manager.import_entries(sys.stdin, format=args.format, overwrite=args.overwrite)
     
     print(f"Import complete:")
     print(f"  Added: {stats['added']}")
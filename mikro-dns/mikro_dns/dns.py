@@ -10,10 +10,148 @@ Website: https://github.com/munger
 Licence: MIT
 """
 
-from typing import List, Dict, Optional
+import fnmatch
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from mikro_common import MikroTikClient, ResourceManager
 
 
+# Entry fields returned by list_entries() and their defaults, in order
+_FIELD_DEFAULTS = {
+    'id': None,
+    'name': '',
+    'type': 'A',
+    'address': '',
+    'cname': '',
+    'mx-preference': '',
+    'mx-exchange': '',
+    'text': '',
+    'ns': '',
+    'srv-priority': '',
+    'srv-weight': '',
+    'srv-port': '',
+    'srv-target': '',
+    'forward-to': '',
+    'regexp': '',
+    'ttl': '1d',
+    'comment': '',
+    'disabled': False,
+}
+
+# Values read as true: librouteros already turns 'true'/'yes' into True,
+# strings come from CSV/JSON imports and callers
+_TRUTHY = frozenset({True, 'true', 'yes', '1'})
+
+# Low-cardinality fields whose values are interned, so the rows of a large
+# table share one string object per distinct value
+_INTERNED_FIELDS = ('type', 'ttl')
+
+_intern = sys.intern
+
+
+def _to_bool(value) -> bool:
+    """Interpret a boolean from the API, an import file or a caller"""
+    if isinstance(value, str):
+        value = value.lower()
+    return value in _TRUTHY
+
+
+def _from_bool(value: bool) -> str:
+    """Format a boolean for the API"""
+    return 'yes' if value else 'no'
+
+
+def _field_template(fields: Iterable[str]) -> Dict:
+    """Restrict _FIELD_DEFAULTS to the given API field names ('.id' is 'id')"""
+    keep = {'id' if field == '.id' else field for field in fields}
+    return {key: value for key, value in _FIELD_DEFAULTS.items() if key in keep}
+
+
+def _row_from(entry: Dict, template: Dict = _FIELD_DEFAULTS) -> Dict:
+    """
+    Build a list_entries() row from an API row.
+    
+    The row starts as a copy of the template's defaults and the values the
+    router sent are copied over it, which is faster than looking up every
+    field of every row.
+    
+    Args:
+        entry: Row returned by the API
+        template: Fields to include and their defaults
+        
+    Returns:
+        DNS entry dictionary
+    """
+    row = template.copy()
+    for key, value in entry.items():
+        if value and key in row:
+            row[key] = value
+    if 'id' in row:
+        row['id'] = entry.get('.id')
+    if 'disabled' in row:
+        row['disabled'] = _to_bool(entry.get('disabled', False))
+    for key in _INTERNED_FIELDS:
+        value = row.get(key)
+        if type(value) is str:
+            row[key] = _intern(value)
+    return row
+
+
+def _project(entries: Iterable[Dict], fields: Iterable[str]) -> Iterator[Dict]:
+    """Reduce full list_entries() rows to the given API field names"""
+    keys = tuple(_field_template(fields))
+    for entry in entries:
+        yield {key: entry[key] for key in keys}
+
+
+# Entry keys (as returned by list_entries) -> add_entry() arguments
+_ENTRY_ARGS = {
+    'name': 'name',
+    'type': 'record_type',
+    'address': 'address',
+    'cname': 'cname',
+    'mx-preference': 'mx_preference',
+    'mx-exchange': 'mx_exchange',
+    'text': 'text',
+    'ns': 'ns',
+    'srv-priority': 'srv_priority',
+    'srv-weight': 'srv_weight',
+    'srv-port': 'srv_port',
+    'srv-target': 'srv_target',
+    'forward-to': 'forward_to',
+    'regexp': 'regexp',
+    'ttl': 'ttl',
+    'comment': 'comment',
+    'disabled': 'disabled',
+}
+
+
+# Record type -> (argument, API key, error message) for each field the
+# type requires
+_REQUIRED = {
+    'A': (('address', 'address', "A record requires an address"),),
+    'AAAA': (('address', 'address', "AAAA record requires an address"),),
+    'CNAME': (('cname', 'cname', "CNAME record requires a cname target"),),
+    'MX': (('mx_exchange', 'mx-exchange', "MX record requires mx-exchange"),),
+    'TXT': (('text', 'text', "TXT record requires text content"),),
+    'NS': (('ns', 'ns', "NS record requires a name server"),),
+    'SRV': (('srv_target', 'srv-target', "SRV record requires a target"),),
+    'FWD': (('forward_to', 'forward-to', "FWD record requires forward-to server"),),
+    'REGEXP': (('regexp', 'regexp', "REGEXP record requires a regular expression"),),
+    # NXDOMAIN doesn't need additional parameters
+    'NXDOMAIN': (),
+}
+
+# Record type -> (argument, API key) for each field the type can also take
+_OPTIONAL = {
+    'MX': (('mx_preference', 'mx-preference'),),
+    'SRV': (('srv_priority', 'srv-priority'), ('srv_weight', 'srv-weight'), ('srv_port', 'srv-port')),
+}
+
+
 class DNSManager(ResourceManager):
     """Manage DNS static entries on MikroTik router"""
     
@@ -25,41 +163,110 @@ class DNSManager(ResourceManager):
             client: Connected MikroTikClient instance
         """
         super().__init__(client, '/ip/dns/static')
+        # (fetch time, entries) from the last full list_entries() call
+        self._entries_cache: Optional[Tuple[float, List[Dict]]] = None
+        self._cache_ttl = 5.0
+        self._name_index: Optional[Dict[str, Dict]] = None
+        self._indexed_entries: Optional[List[Dict]] = None
+        # Name -> (lookup time, entry ID or None if absent) from _locate()
+        self._located: Dict[str, Tuple[float, Optional[str]]] = {}
+    
+    def invalidate(self):
+        """Discard cached entries so the next read fetches them from the router"""
+        super().invalidate()
+        self._entries_cache = None
+        self._name_index = None
+        self._indexed_entries = None
+        self._located = {}
+    
+    def _refresh_index(self, entries: List[Dict]):
+        """Index entries by name (first entry wins)"""
+        index = {}
+        for entry in entries:
+            index.setdefault(entry['name'], entry)
+        self._name_index = index
+        self._indexed_entries = entries
     
-    def list_entries(self) -> List[Dict]:
+    def list_entries(self, fields: Optional[Iterable[str]] = None,
+                     force_refresh: bool = False) -> List[Dict]:
         """
         List all DNS static entries.
         
+        Full listings are cached for a few seconds (and until the next
+        change made through this manager); the cached list is shared
+        between callers and must not be modified.
+        
+        Args:
+            fields: API field names to fetch (e.g. ('.id', 'name')); the
+                router only sends these and each entry only holds them
+                ('.id' is returned as 'id'). Default: all fields.
+            force_refresh: Fetch from the router even if a cached list is fresh
+        
         Returns:
             List of dictionaries containing DNS entries
         """
-        path = self.client.get_path(self.resource_path)
-        entries = []
+        if fields is not None:
+            fields = tuple(fields)
         
-        for entry in path:
-            entries.append({
-                'id': entry.get('.id'),
-                'name': entry.get('name') or '',
-                'type': entry.get('type') or 'A',
-                'address': entry.get('address') or '',
-                'cname': entry.get('cname') or '',
-                'mx-preference': entry.get('mx-preference') or '',
-                'mx-exchange': entry.get('mx-exchange') or '',
-                'text': entry.get('text') or '',
-                'ns': entry.get('ns') or '',
-                'srv-priority': entry.get('srv-priority') or '',
-                'srv-weight': entry.get('srv-weight') or '',
-                'srv-port': entry.get('srv-port') or '',
-                'srv-target': entry.get('srv-target') or '',
-                'forward-to': entry.get('forward-to') or '',
-                'regexp': entry.get('regexp') or '',
-                'ttl': entry.get('ttl') or '1d',
-                'comment': entry.get('comment') or '',
-                'disabled': entry.get('disabled', 'false') == 'true'
-            })
+        if not force_refresh:
+            cached = self._cached_entries()
+            if cached is not None:
+                return cached if fields is None else list(_project(cached, fields))
         
+        entries = list(self._fetch_entries(fields))
+        if fields is None:
+            self._entries_cache = (time.monotonic(), entries)
         return entries
     
+    def iter_entries(self, fields: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """
+        Iterate over DNS static entries.
+        
+        Yields from a fresh cached listing if there is one, otherwise builds
+        the rows of a fresh listing one at a time without caching them.
+        librouteros reads the whole reply before returning it, so stopping
+        early saves building rows, not fetching them.
+        
+        Args:
+            fields: API field names to fetch, as for list_entries()
+            
+        Yields:
+            DNS entry dictionaries
+        """
+        if fields is not None:
+            fields = tuple(fields)
+        
+        cached = self._cached_entries()
+        if cached is None:
+            yield from self._fetch_entries(fields)
+        elif fields is None:
+            yield from cached
+        else:
+            yield from _project(cached, fields)
+    
+    def _cached_entries(self) -> Optional[List[Dict]]:
+        """Get the cached full listing, or None if there isn't a fresh one"""
+        if self._entries_cache is None:
+            return None
+        cached_at, cached = self._entries_cache
+        if time.monotonic() - cached_at >= self._cache_ttl:
+            return None
+        return cached
+    
+    def _fetch_entries(self, fields: Optional[Tuple[str, ...]]) -> Iterator[Dict]:
+        """Fetch entries from the router, building each row as it is yielded"""
+        path = self.path
+        template = _FIELD_DEFAULTS
+        
+        if fields is not None:
+            template = _field_template(fields)
+            if hasattr(path, 'select'):
+                from librouteros.query import Key
+                path = path.select(*(Key(field) for field in fields))
+        
+        for entry in path:
+            yield _row_from(entry, template)
+    
     def find_entry(self, name: str) -> Optional[Dict]:
         """
         Find DNS entry by name.
@@ -71,10 +278,73 @@ class DNSManager(ResourceManager):
             Entry dictionary if found, None otherwise
         """
         entries = self.list_entries()
-        for entry in entries:
-            if entry['name'] == name:
-                return entry
-        return None
+        if self._indexed_entries is not entries:
+            self._refresh_index(entries)
+        return self._name_index.get(name)
+    
+    def get_entry(self, entry_id: str) -> Optional[Dict]:
+        """
+        Get DNS entry by ID.
+        
+        Args:
+            entry_id: Entry ID
+            
+        Returns:
+            Entry dictionary if found, None otherwise
+        """
+        return next((entry for entry in self.list_entries() if entry['id'] == entry_id), None)
+    
+    def _find_id(self, name: str) -> Optional[str]:
+        """
+        Get the ID of the entry with the given name.
+        
+        Asks the router for just that entry's ID rather than fetching the
+        whole table.
+        
+        Args:
+            name: DNS name to look up
+            
+        Returns:
+            Entry ID, or None if not found
+        """
+        path = self.path
+        if not hasattr(path, 'select'):
+            entry = self.find_entry(name)
+            return entry['id'] if entry else None
+        
+        from librouteros.query import Key
+        match = next(iter(path.select(Key('.id')).where(Key('name') == name)), None)
+        return match['.id'] if match else None
+    
+    def _locate(self, name: str) -> Tuple[bool, Optional[str]]:
+        """
+        Resolve a DNS name to its entry ID.
+        
+        Results are reused for as long as a cached listing would be (and
+        until the next change made through this manager), so changes made
+        on the router by anything else are seen. Uses the cached listing
+        when it is fresh, otherwise asks the router.
+        
+        Args:
+            name: DNS name to look up
+            
+        Returns:
+            Tuple of (found, entry ID or None)
+        """
+        now = time.monotonic()
+        located = self._located.get(name)
+        if located is not None and now - located[0] < self._cache_ttl:
+            entry_id = located[1]
+        else:
+            if self._cached_entries() is not None:
+                # Only as fresh as the listing it came from
+                now = self._entries_cache[0]
+                entry = self.find_entry(name)
+                entry_id = entry['id'] if entry else None
+            else:
+                entry_id = self._find_id(name)
+            self._located[name] = (now, entry_id)
+        return entry_id is not None, entry_id
     
     def add_entry(self, name: str, record_type: str = 'A', address: str = '', 
                   cname: str = '', mx_preference: str = '', mx_exchange: str = '',
@@ -110,12 +380,47 @@ class DNSManager(ResourceManager):
         Raises:
             ValueError: If entry already exists or invalid parameters
         """
-        # Check if entry already exists
-        existing = self.find_entry(name)
-        if existing:
+        # Check if entry already exists (asks the router for its ID only)
+        found, _ = self._locate(name)
+        if found:
             raise ValueError(f"DNS entry '{name}' already exists. Use update to modify it.")
         
-        path = self.client.get_path(self.resource_path)
+        path = self.path
+        
+        params = self._build_params(
+            name, record_type=record_type, address=address, cname=cname,
+            mx_preference=mx_preference, mx_exchange=mx_exchange, text=text, ns=ns,
+            srv_priority=srv_priority, srv_weight=srv_weight, srv_port=srv_port,
+            srv_target=srv_target, forward_to=forward_to, regexp=regexp,
+            ttl=ttl, comment=comment, disabled=disabled
+        )
+        
+        result = path.add(**params)
+        self.invalidate()
+        # Result can be a list or a string depending on librouteros version
+        if isinstance(result, list) and len(result) > 0:
+            return result[0].get('ret', result[0].get('.id', ''))
+        return str(result)
+    
+    @staticmethod
+    def _build_params(name: str, record_type: str = 'A', ttl: str = "1d",
+                      comment: str = "", disabled: bool = False, **fields) -> Dict[str, str]:
+        """
+        Build and validate API parameters for a new DNS entry.
+        
+        Takes the same arguments as add_entry(); the type-specific ones
+        (address, cname, ...) are picked out using _REQUIRED and _OPTIONAL.
+        
+        Returns:
+            Parameters for the API add command
+            
+        Raises:
+            ValueError: If the record type is unknown or a field it requires
+                is missing
+        """
+        required = _REQUIRED.get(record_type)
+        if required is None:
+            raise ValueError(f"Unsupported record type: {record_type}")
         
         params = {
             'name': name,
@@ -124,67 +429,64 @@ class DNSManager(ResourceManager):
         }
         
         # Add type-specific parameters
-        if record_type in ['A', 'AAAA']:
-            if not address:
-                raise ValueError(f"{record_type} record requires an address")
-            params['address'] = address
-        elif record_type == 'CNAME':
-            if not cname:
-                raise ValueError("CNAME record requires a cname target")
-            params['cname'] = cname
-        elif record_type == 'MX':
-            if not mx_exchange:
-                raise ValueError("MX record requires mx-exchange")
-            params['mx-exchange'] = mx_exchange
-            if mx_preference:
-                params['mx-preference'] = mx_preference
-        elif record_type == 'TXT':
-            if not text:
-                raise ValueError("TXT record requires text content")
-            params['text'] = text
-        elif record_type == 'NS':
-            if not ns:
-                raise ValueError("NS record requires a name server")
-            params['ns'] = ns
-        elif record_type == 'SRV':
-            if not srv_target:
-                raise ValueError("SRV record requires a target")
-            params['srv-target'] = srv_target
-            if srv_priority:
-                params['srv-priority'] = srv_priority
-            if srv_weight:
-                params['srv-weight'] = srv_weight
-            if srv_port:
-                params['srv-port'] = srv_port
-        elif record_type == 'FWD':
-            if not forward_to:
-                raise ValueError("FWD record requires forward-to server")
-            params['forward-to'] = forward_to
-        elif record_type == 'REGEXP':
-            if not regexp:
-                raise ValueError("REGEXP record requires a regular expression")
-            params['regexp'] = regexp
-        elif record_type == 'NXDOMAIN':
-            # NXDOMAIN doesn't need additional parameters
-            pass
+        for arg, key, message in required:
+            value = fields.get(arg)
+            if not value:
+                raise ValueError(message)
+            params[key] = value
+        for arg, key in _OPTIONAL.get(record_type, ()):
+            value = fields.get(arg)
+            if value:
+                params[key] = value
         
         if comment:
             params['comment'] = comment
         
-        if disabled:
-            params['disabled'] = 'yes'
+        if _to_bool(disabled):
+            params['disabled'] = _from_bool(True)
         
-        result = path.add(**params)
-        # Result can be a list or a string depending on librouteros version
-        if isinstance(result, list) and len(result) > 0:
-            return result[0].get('ret', result[0].get('.id', ''))
-        return str(result)
+        return params
+    
+    def bulk_add(self, entries: List[Dict]) -> List[str]:
+        """
+        Add several DNS entries in one pipelined batch.
+        
+        Entries use the same keys as list_entries() returns (so an export
+        can be added back); other keys such as 'id' are ignored. Existing
+        names are fetched once and every entry is validated before anything
+        is sent to the router.
+        
+        Args:
+            entries: DNS entries to add
+            
+        Returns:
+            IDs of the created entries, in order
+            
+        Raises:
+            ValueError: If a name already exists, repeats, or an entry is invalid
+        """
+        # Compared as str: librouteros returns numeric-looking names as int
+        existing = {str(entry['name']) for entry in self.list_entries(fields=('name',))}
+        
+        rows = []
+        for entry in entries:
+            kwargs = {arg: entry[key] for key, arg in _ENTRY_ARGS.items() if key in entry}
+            name = kwargs.pop('name', None)
+            if not name:
+                raise ValueError("DNS entry requires a name")
+            if str(name) in existing:
+                raise ValueError(f"DNS entry '{name}' already exists. Use update to modify it.")
+            existing.add(str(name))
+            rows.append(self._build_params(name, **kwargs))
+        
+        return super().bulk_add(rows)
     
     def update_entry(self, name: str, record_type: Optional[str] = None,
                     address: Optional[str] = None, cname: Optional[str] = None,
                     mx_preference: Optional[str] = None, mx_exchange: Optional[str] = None,
                     text: Optional[str] = None, ttl: Optional[str] = None, 
-                    comment: Optional[str] = None, disabled: Optional[bool] = None) -> bool:
+                    comment: Optional[str] = None, disabled: Optional[bool] = None,
+                    entry_id: Optional[str] = None) -> bool:
         """
         Update an existing DNS entry.
         
@@ -199,17 +501,19 @@ class DNSManager(ResourceManager):
             ttl: New TTL (optional)
             comment: New comment (optional)
             disabled: New disabled state (optional)
+            entry_id: ID of the entry, if already known (skips the name lookup)
             
         Returns:
             True if updated, False if not found
         """
-        entry = self.find_entry(name)
-        if not entry:
-            return False
+        if entry_id is None:
+            found, entry_id = self._locate(name)
+            if not found:
+                return False
         
-        path = self.client.get_path(self.resource_path)
+        path = self.path
         
-        params = {'.id': entry['id']}
+        params = {'.id': entry_id}
         
         if record_type is not None:
             params['type'] = record_type
@@ -228,32 +532,67 @@ class DNSManager(ResourceManager):
         if comment is not None:
             params['comment'] = comment
         if disabled is not None:
-            params['disabled'] = 'yes' if disabled else 'no'
+            params['disabled'] = _from_bool(_to_bool(disabled))
         
         path.update(**params)
+        self.invalidate()
         return True
     
-    def delete_entry(self, name: str) -> bool:
+    def delete_entry(self, name: str, entry_id: Optional[str] = None) -> bool:
         """
         Delete a DNS entry by name.
         
         Args:
             name: DNS name to delete
+            entry_id: ID of the entry, if already known (skips the name lookup)
             
         Returns:
             True if deleted, False if not found
         """
-        entry = self.find_entry(name)
-        if not entry:
-            return False
+        if entry_id is None:
+            found, entry_id = self._locate(name)
+            if not found:
+                return False
         
-        path = self.client.get_path(self.resource_path)
-        path.remove(entry['id'])
+        path = self.path
+        path.remove(entry_id)
+        self.invalidate()
         return True
     
+    def bulk_delete(self, names: Iterable[str]) -> int:
+        """
+        Delete several DNS entries by name.
+        
+        Names are resolved from one listing and all entries are removed
+        with a single API command.
+        
+        Args:
+            names: DNS names to delete
+            
+        Returns:
+            Number of entries deleted (names not found are skipped)
+        """
+        names = list(names)
+        if not names:
+            return 0
+        
+        # Keyed by str: librouteros returns numeric-looking names as int
+        index = {}
+        for entry in self.list_entries(fields=('.id', 'name')):
+            index.setdefault(str(entry['name']), entry['id'])
+        entry_ids = list(dict.fromkeys(index[name] for name in map(str, names) if name in index))
+        
+        if entry_ids:
+            path = self.path
+            path.remove(*entry_ids)
+            self.invalidate()
+        return len(entry_ids)
+    
     def search_entries(self, pattern: str) -> List[Dict]:
         """
-        Search for DNS entries matching a pattern.
+        Search for DNS entries whose name or address matches a pattern.
+        
+        Matching is case-insensitive.
         
         Args:
             pattern: Search pattern (supports wildcards: *, ?)
@@ -261,47 +600,76 @@ class DNSManager(ResourceManager):
         Returns:
             List of matching entries
         """
-        # Search both name and address fields
-        return super().search_entries(pattern, fields=['name', 'address'])
+        # Search both name and address fields, ignoring case as DNS does.
+        # librouteros returns numeric-looking values (e.g. a name '123') as
+        # int, so match their string form
+        match = re.compile(fnmatch.translate(pattern), re.IGNORECASE).match
+        return [
+            entry for entry in self.list_entries()
+            if match(str(entry['name'])) or match(str(entry['address']))
+        ]
     
     def validate_entries(self) -> Dict[str, List[Dict]]:
         """
         Validate DNS entries for conflicts and issues.
         
         Returns:
-            Dictionary with 'duplicates' and 'conflicts' lists
+            Dictionary with 'duplicates' (one item per repeated name, with
+            all of its entries) and 'conflicts' (one item per address
+            shared by different names) lists
         """
-        entries = self.list_entries()
+        entries = self.list_entries(fields=('.id', 'name', 'address'))
         
-        # Check for duplicate names
-        name_map = {}
-        duplicates = []
+        # Group entries by name and by address in one pass
+        by_name = defaultdict(list)
+        by_ip = defaultdict(list)
         for entry in entries:
-            name = entry['name']
-            if name in name_map:
-                duplicates.append({
-                    'name': name,
-                    'entries': [name_map[name], entry]
-                })
-            else:
-                name_map[name] = entry
+            by_name[entry['name']].append(entry)
+            # Records without an address (CNAME, TXT, ...) can't conflict
+            if entry['address']:
+                by_ip[entry['address']].append(entry)
+        
+        # Duplicate names
+        duplicates = [
+            {'name': name, 'entries': group}
+            for name, group in by_name.items() if len(group) > 1
+        ]
         
-        # Check for IP conflicts (same IP, different names)
-        ip_map = {}
+        # IP conflicts (same IP, different names)
         conflicts = []
-        for entry in entries:
-            ip = entry['address']
-            if ip in ip_map and ip_map[ip]['name'] != entry['name']:
-                conflicts.append({
-                    'address': ip,
-                    'names': [ip_map[ip]['name'], entry['name']]
-                })
-            else:
-                ip_map[ip] = entry
+        for ip, group in by_ip.items():
+            names = list(dict.fromkeys(entry['name'] for entry in group))
+            if len(names) > 1:
+                conflicts.append({'address': ip, 'names': names})
         
         return {
             'duplicates': duplicates,
             'conflicts': conflicts
         }
     
+    def _entry_id(self, entry: Dict) -> Optional[str]:
+        """Get the API ID of an entry returned by list_entries()"""
+        return entry.get('id')
+    
+    def _import_fields(self, entry: Dict) -> Dict:
+        """
+        Turn an imported entry (as exported by list_entries()) into API fields.
+        
+        The ID is dropped, as are empty fields, which an export holds for
+        every field the record type doesn't use; 'disabled' is sent as yes/no.
+        
+        Args:
+            entry: Entry read from an import file
+            
+        Returns:
+            Fields for the API
+        """
+        fields = {
+            key: value for key, value in entry.items()
+            if key not in ('id', '.id') and value is not None and value != ''
+        }
+        if 'disabled' in fields:
+            fields['disabled'] = _from_bool(_to_bool(fields['disabled']))
+        return fields
+    
     # export_entries and import_entries are inherited from ResourceManager
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+test_dns.py
+
+  MikroTik management tools
+
+Copyright (c) 2025 Tim Hosking
+Email: tim@mungerware.com
+Website: https://github.com/munger
+Licence: MIT
+"""
+
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from librouteros.api import Api
+
+from mikro_dns import dns
+from mikro_dns.dns import DNSManager
+
+
+class FakeRouter:
+    """
+    Stand-in for librouteros' wire protocol backed by an in-memory table.
+
+    Answers print (with .proplist and ?=key=value queries), add, set and
+    remove under /ip/dns/static like RouterOS does, so the real librouteros
+    Api and Path objects run on top of it. Values are stored as the API
+    words sent them, so librouteros parses them back the way it parses a
+    real router's replies (e.g. a name '1234' comes back as int).
+    """
+
+    PATH = '/ip/dns/static'
+
+    def __init__(self, rows=()):
+        self.rows = []
+        self.next_id = 1
+        self.sent = []
+        self.queued = []
+        for row in rows:
+            self.insert(dict(row))
+
+    def insert(self, attrs):
+        entry_id = f'*{self.next_id:X}'
+        self.next_id += 1
+        self.rows.append({'.id': entry_id, 'type': 'A', 'ttl': '1d', 'disabled': 'false', **attrs})
+        return entry_id
+
+    def row(self, entry_id):
+        return next((row for row in self.rows if row['.id'] == entry_id), None)
+
+    def by_name(self, name):
+        return [row for row in self.rows if row.get('name') == name]
+
+    def writeSentence(self, cmd, *words):
+        self.sent.append((cmd, words))
+        attrs = {}
+        queries = []
+        tag = None
+        for word in words:
+            if word.startswith('.tag='):
+                tag = word[len('.tag='):]
+            elif word.startswith('?='):
+                queries.append(tuple(word[2:].split('=', 1)))
+            elif word.startswith('='):
+                key, _, value = word[1:].partition('=')
+                attrs[key] = value
+        replies = self.respond(cmd[len(self.PATH) + 1:], attrs, queries)
+        tail = [f'.tag={tag}'] if tag is not None else []
+        self.queued.extend((reply_word, reply_words + tail) for reply_word, reply_words in replies)
+
+    def readSentence(self):
+        return self.queued.pop(0)
+
+    def respond(self, cmd, attrs, queries):
+        if cmd == 'print':
+            proplist = attrs['.proplist'].split(',') if '.proplist' in attrs else None
+            replies = []
+            for row in self.rows:
+                if all(row.get(key) == value for key, value in queries):
+                    keys = proplist or list(row)
+                    replies.append(('!re', [f'={key}={row[key]}' for key in keys if key in row]))
+            return replies + [('!done', [])]
+        if cmd == 'add':
+            return [('!done', [f'=ret={self.insert(attrs)}'])]
+        if cmd in ('set', 'remove'):
+            ids = attrs.pop('.id').split(',')
+            if any(self.row(entry_id) is None for entry_id in ids):
+                return [('!trap', ['=message=no such item']), ('!done', [])]
+            for entry_id in ids:
+                if cmd == 'set':
+                    self.row(entry_id).update(attrs)
+                else:
+                    self.rows.remove(self.row(entry_id))
+            return [('!done', [])]
+        return [('!trap', [f'=message=unknown command {cmd}']), ('!done', [])]
+
+
+def make_manager(rows=()):
+    """Create a DNSManager talking to a FakeRouter."""
+    router = FakeRouter(rows)
+    api = Api(router)
+    client = SimpleNamespace(api=api, get_path=lambda path: api.path(path))
+    return DNSManager(client), router
+
+
+class TestImportExport(unittest.TestCase):
+    """Test exporting DNS entries and importing them back."""
+
+    def test_overwrite_round_trip(self):
+        """Test an export imported with overwrite updates the existing entries."""
+        manager, router = make_manager([
+            {'name': 'a.lan', 'address': '10.0.0.1', 'comment': 'first'},
+            {'name': 'b.lan', 'type': 'CNAME', 'cname': 'a.lan', 'disabled': 'true'},
+        ])
+        exported = manager.export_entries('json')
+        router.rows[0]['address'] = '10.0.0.99'
+        router.rows[1]['disabled'] = 'false'
+        manager.invalidate()
+
+        stats = manager.import_entries(exported, overwrite=True)
+
+        self.assertEqual(stats, {'added': 0, 'updated': 2, 'skipped': 0})
+        self.assertEqual(len(router.rows), 2)
+        self.assertEqual(router.rows[0]['address'], '10.0.0.1')
+        self.assertEqual(router.rows[1]['disabled'], 'yes')
+        set_words = [words for cmd, words in router.sent if cmd.endswith('/set')]
+        self.assertEqual(len(set_words), 2)
+        for words in set_words:
+            self.assertFalse(any(word.startswith('=id=') for word in words))
+            self.assertFalse(any(word.endswith('=') for word in words))
+
+    def test_csv_import_adds(self):
+        """Test a CSV export imported into an empty table adds every entry."""
+        source, _ = make_manager([{'name': 'a.lan', 'address': '10.0.0.1'},
+                                  {'name': '1234', 'address': '10.0.0.2'}])
+        exported = source.export_entries('csv')
+
+        manager, router = make_manager()
+        stats = manager.import_entries(exported, format='csv')
+
+        self.assertEqual(stats, {'added': 2, 'updated': 0, 'skipped': 0})
+        self.assertEqual([row['name'] for row in router.rows], ['a.lan', '1234'])
+        self.assertEqual(router.rows[0]['disabled'], 'false')
+
+    def test_numeric_name_not_duplicated(self):
+        """Test an import matches existing entries with numeric-looking names."""
+        manager, router = make_manager([{'name': '1234', 'address': '10.0.0.1'}])
+        exported = manager.export_entries('json')
+        stats = manager.import_entries(exported)
+        self.assertEqual(stats, {'added': 0, 'updated': 0, 'skipped': 1})
+        self.assertEqual(len(router.rows), 1)
+
+
+class TestBulkAdd(unittest.TestCase):
+    """Test DNSManager.bulk_add."""
+
+    def test_adds_all(self):
+        """Test entries are validated and sent in one batch."""
+        manager, router = make_manager()
+        ids = manager.bulk_add([
+            {'name': 'a.lan', 'address': '10.0.0.1'},
+            {'name': 'b.lan', 'type': 'CNAME', 'cname': 'a.lan', 'disabled': True},
+        ])
+        self.assertEqual(ids, [row['.id'] for row in router.rows])
+        self.assertEqual(router.by_name('b.lan')[0]['disabled'], 'yes')
+
+    def test_existing_name(self):
+        """Test an existing name is rejected before anything is sent."""
+        manager, router = make_manager([{'name': 'a.lan', 'address': '10.0.0.1'}])
+        with self.assertRaises(ValueError):
+            manager.bulk_add([{'name': 'b.lan', 'address': '10.0.0.2'},
+                              {'name': 'a.lan', 'address': '10.0.0.3'}])
+        self.assertEqual(len(router.rows), 1)
+
+    def test_existing_numeric_name(self):
+        """Test an existing name the router returns as int is still a duplicate."""
+        manager, router = make_manager([{'name': '1234', 'address': '10.0.0.1'}])
+        with self.assertRaises(ValueError):
+            manager.bulk_add([{'name': '1234', 'address': '10.0.0.2'}])
+        self.assertEqual(len(router.rows), 1)
+
+    def test_repeated_name(self):
+        """Test a name repeated within the batch is rejected."""
+        manager, router = make_manager()
+        with self.assertRaises(ValueError):
+            manager.bulk_add([{'name': 'a.lan', 'address': '10.0.0.1'},
+                              {'name': 'a.lan', 'address': '10.0.0.2'}])
+        self.assertEqual(router.rows, [])
+
+    def test_invalid_entry(self):
+        """Test an entry missing a required field is rejected."""
+        manager, router = make_manager()
+        with self.assertRaises(ValueError):
+            manager.bulk_add([{'name': 'a.lan', 'address': '10.0.0.1'},
+                              {'name': 'b.lan', 'type': 'CNAME'}])
+        self.assertEqual(router.rows, [])
+
+
+class TestBulkDelete(unittest.TestCase):
+    """Test DNSManager.bulk_delete."""
+
+    def test_single_remove(self):
+        """Test all entries are removed with one command and missing names are skipped."""
+        manager, router = make_manager([{'name': name, 'address': '10.0.0.1'}
+                                        for name in ('a.lan', 'b.lan', 'c.lan')])
+        self.assertEqual(manager.bulk_delete(['a.lan', 'c.lan', 'missing.lan', 'a.lan']), 2)
+        self.assertEqual([row['name'] for row in router.rows], ['b.lan'])
+        removes = [words for cmd, words in router.sent if cmd.endswith('/remove')]
+        self.assertEqual(removes, [('=.id=*1,*3',)])
+
+    def test_numeric_name(self):
+        """Test names the router returns as int are found."""
+        manager, router = make_manager([{'name': '1234', 'address': '10.0.0.1'}])
+        self.assertEqual(manager.bulk_delete(['1234']), 1)
+        self.assertEqual(router.rows, [])
+
+    def test_nothing_found(self):
+        """Test no remove is sent when no name matches."""
+        manager, router = make_manager([{'name': 'a.lan', 'address': '10.0.0.1'}])
+        self.assertEqual(manager.bulk_delete(['missing.lan']), 0)
+        self.assertFalse(any(cmd.endswith('/remove') for cmd, _ in router.sent))
+
+
+class TestEnableDisable(unittest.TestCase):
+    """Test the disabled flag is sent as yes/no whatever form it is given in."""
+
+    def test_to_bool(self):
+        """Test values from the API, import files and callers are interpreted."""
+        for value in (True, 'true', 'yes', 'YES', 'True', '1'):
+            self.assertTrue(dns._to_bool(value), value)
+        for value in (False, None, 'false', 'no', 'No', '0', ''):
+            self.assertFalse(dns._to_bool(value), value)
+
+    def test_from_bool(self):
+        """Test booleans are formatted for the API."""
+        self.assertEqual(dns._from_bool(True), 'yes')
+        self.assertEqual(dns._from_bool(False), 'no')
+
+    def test_enable_disable(self):
+        """Test enable_entry and disable_entry set the router's disabled flag."""
+        manager, router = make_manager([{'name': 'a.lan', 'address': '10.0.0.1'}])
+        self.assertTrue(manager.disable_entry('a.lan'))
+        self.assertEqual(router.row('*1')['disabled'], 'yes')
+        self.assertTrue(manager.list_entries()[0]['disabled'])
+        self.assertTrue(manager.enable_entry('a.lan'))
+        self.assertEqual(router.row('*1')['disabled'], 'no')
+        self.assertFalse(manager.list_entries()[0]['disabled'])
+
+    def test_update_string_flag(self):
+        """Test string flags from callers are not sent as-is."""
+        manager, router = make_manager([{'name': 'a.lan', 'address': '10.0.0.1'}])
+        self.assertTrue(manager.update_entry('a.lan', disabled='False'))
+        self.assertEqual(router.row('*1')['disabled'], 'no')
+        self.assertFalse(manager.enable_entry('missing.lan'))
+
+
+class TestLocate(unittest.TestCase):
+    """Test the name to ID memo used by update_entry and delete_entry."""
+
+    def setUp(self):
+        self.now = 100.0
+        patch = mock.patch.object(dns.time, 'monotonic', side_effect=lambda: self.now)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.manager, self.router = make_manager([{'name': 'a.lan', 'address': '10.0.0.1'}])
+
+    def prints(self):
+        """Number of print commands sent so far."""
+        return sum(cmd.endswith('/print') for cmd, _ in self.router.sent)
+
+    def replace_on_router(self):
+        """Recreate a.lan on the router behind the manager's back."""
+        self.router.rows.clear()
+        return self.router.insert({'name': 'a.lan', 'address': '10.0.0.2'})
+
+    def test_reused_within_ttl(self):
+        """Test a name is looked up once while the memo is fresh."""
+        self.assertEqual(self.manager._locate('a.lan'), (True, '*1'))
+        self.now += self.manager._cache_ttl / 2
+        self.assertEqual(self.manager._locate('a.lan'), (True, '*1'))
+        self.assertEqual(self.prints(), 1)
+
+    def test_expires(self):
+        """Test changes made on the router are seen once the memo expires."""
+        self.assertEqual(self.manager._locate('a.lan'), (True, '*1'))
+        new_id = self.replace_on_router()
+        self.now += self.manager._cache_ttl
+        self.assertEqual(self.manager._locate('a.lan'), (True, new_id))
+
+    def test_missing_name(self):
+        """Test a name created on the router after a miss is found once the memo expires."""
+        self.assertEqual(self.manager._locate('b.lan'), (False, None))
+        self.router.insert({'name': 'b.lan', 'address': '10.0.0.2'})
+        self.assertEqual(self.manager._locate('b.lan'), (False, None))
+        self.now += self.manager._cache_ttl
+        self.assertEqual(self.manager._locate('b.lan'), (True, '*2'))
+
+    def test_expires_with_listing(self):
+        """Test a result taken from the cached listing is no fresher than the listing."""
+        self.manager.list_entries()
+        self.now += self.manager._cache_ttl - 1
+        self.assertEqual(self.manager._locate('a.lan'), (True, '*1'))
+        new_id = self.replace_on_router()
+        self.now += 1
+        self.assertEqual(self.manager._locate('a.lan'), (True, new_id))
+
+    def test_invalidated_by_changes(self):
+        """Test changes made through the manager discard the memo."""
+        self.assertEqual(self.manager._locate('a.lan'), (True, '*1'))
+        self.manager.add_entry('b.lan', address='10.0.0.2')
+        new_id = self.replace_on_router()
+        self.assertEqual(self.manager._locate('a.lan'), (True, new_id))
+
+
+class TestValidate(unittest.TestCase):
+    """Test DNSManager.validate_entries."""
+
+    def test_clean(self):
+        """Test distinct names and addresses report nothing."""
+        manager, _ = make_manager([{'name': 'a.lan', 'address': '10.0.0.1'},
+                                   {'name': 'b.lan', 'address': '10.0.0.2'}])
+        self.assertEqual(manager.validate_entries(), {'duplicates': [], 'conflicts': []})
+
+    def test_duplicates(self):
+        """Test entries sharing a name are grouped into one item."""
+        manager, _ = make_manager([{'name': 'a.lan', 'address': '10.0.0.1'},
+                                   {'name': 'b.lan', 'address': '10.0.0.2'},
+                                   {'name': 'a.lan', 'address': '10.0.0.3'},
+                                   {'name': 'a.lan', 'address': '10.0.0.4'}])
+        duplicates = manager.validate_entries()['duplicates']
+        self.assertEqual(len(duplicates), 1)
+        self.assertEqual(duplicates[0]['name'], 'a.lan')
+        self.assertEqual([entry['id'] for entry in duplicates[0]['entries']], ['*1', '*3', '*4'])
+
+    def test_conflicts(self):
+        """Test an address shared by different names is reported once per name."""
+        manager, _ = make_manager([{'name': 'a.lan', 'address': '10.0.0.1'},
+                                   {'name': 'b.lan', 'address': '10.0.0.1'},
+                                   {'name': 'a.lan', 'address': '10.0.0.1'},
+                                   {'name': 'c.lan', 'address': '10.0.0.2'}])
+        self.assertEqual(manager.validate_entries()['conflicts'],
+                         [{'address': '10.0.0.1', 'names': ['a.lan', 'b.lan']}])
+
+    def test_no_address(self):
+        """Test records without an address don't conflict."""
+        manager, _ = make_manager([{'name': 'a.lan', 'type': 'CNAME', 'cname': 'c.lan'},
+                                   {'name': 'b.lan', 'type': 'TXT', 'text': 'x'}])
+        self.assertEqual(manager.validate_entries()['conflicts'], [])
+
+
+class TestSearch(unittest.TestCase):
+    """Test DNSManager.search_entries."""
+
+    def setUp(self):
+        self.manager, _ = make_manager([{'name': 'Host.LAN', 'address': '10.0.0.1'},
+                                        {'name': '1234', 'address': '10.0.1.1'},
+                                        {'name': 'mail.lan', 'type': 'MX', 'mx-exchange': 'host.lan'}])
+
+    def search(self, pattern):
+        """Names of the entries matching a pattern."""
+        return [entry['name'] for entry in self.manager.search_entries(pattern)]
+
+    def test_case_insensitive(self):
+        """Test names match regardless of case."""
+        self.assertEqual(self.search('host.*'), ['Host.LAN'])
+        self.assertEqual(self.search('*.lan'), ['Host.LAN', 'mail.lan'])
+
+    def test_numeric_name(self):
+        """Test names the router returns as int are matched."""
+        self.assertEqual(self.search('12*'), [1234])
+
+    def test_address(self):
+        """Test addresses are matched too."""
+        self.assertEqual(self.search('10.0.1.*'), [1234])
+        self.assertEqual(self.search('10.0.0.?'), ['Host.LAN'])
+
+
+if __name__ == '__main__':
+    unittest.main()